@@ -0,0 +1,96 @@
+# Article Record
+# Compact, immutable record for one article. Articles are converted from and to dicts only
+# where JSON is read and written (dataio, json.load/json.dump); everything in between passes
+# Article objects around. Records that are not exactly the four fields stay dicts.
+
+FIELDS = ("url", "title", "content", "published")
+
+
+class Article:
+    """
+    One article: url, title, content, published. Slotted and immutable, so it takes far less
+    memory than the equivalent dict. get() mirrors dict.get so code that reads article
+    dicts also reads Articles.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, url="", title="", content="", published=""):
+        object.__setattr__(self, "url", url)
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "published", published)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Article from a decoded JSON object; missing fields are None, other keys are dropped."""
+        return cls(data.get("url"), data.get("title"), data.get("content"), data.get("published"))
+
+    def to_dict(self):
+        """The article as a dict in field order, ready for json.dump."""
+        return {
+            "url": self.url,
+            "title": self.title,
+            "content": self.content,
+            "published": self.published,
+        }
+
+    def get(self, key, default=None):
+        """Field value by name, like dict.get."""
+        if key in FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Article is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Article is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Article):
+            return NotImplemented
+        return (self.url, self.title, self.content, self.published) == \
+            (other.url, other.title, other.content, other.published)
+
+    def __hash__(self):
+        return hash((self.url, self.title, self.content, self.published))
+
+    def __repr__(self):
+        return (f"Article(url={self.url!r}, title={self.title!r}, "
+                f"content={self.content!r}, published={self.published!r})")
+
+    def __reduce__(self):
+        # Needed for pickling (e.g. to worker processes) since __setattr__ is blocked.
+        return (Article, (self.url, self.title, self.content, self.published))
+
+
+def field_text(value):
+    """A field value as stripped text: "" for None, str(value) for other non-strings."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    return str(value).strip()
+
+
+# Types accepted wherever one article record is expected.
+RECORD_TYPES = (Article, dict)
+
+
+def from_json(value):
+    """
+    Article for a decoded JSON object whose keys are exactly FIELDS, in that order, so that
+    writing it back gives the same JSON. Any other object stays a dict (extra, missing or
+    reordered keys are kept as they are), and any other JSON value is returned unchanged.
+    """
+    if isinstance(value, dict) and tuple(value) == FIELDS:
+        return Article.from_dict(value)
+    return value
+
+
+def to_json(value):
+    """json.dump default= hook: Articles are written as dicts."""
+    if isinstance(value, Article):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,207 @@
+# Article Index
+# Records the byte offset and length of every article of an uncompressed JSON or JSON Lines
+# file in a small binary file next to it (<file>.idx), found in one pass over the raw bytes.
+# With the index, any article can be read without parsing the ones before it, and a file
+# can be split between workers or resumed part-way without scanning it again.
+
+import argparse
+import os
+import struct
+import sys
+from array import array
+
+import jsoncodec
+from article import to_json
+from dataio import FORMATS, AtomicFile, detect_format, split_compression
+from mmapio import MappedEnvelope, decode_span, map_file
+
+INDEX_SUFFIX = ".idx"
+
+# Magic, format code, input size, input mtime_ns, article count; then (offset, length) pairs.
+# Everything is stored little-endian.
+_MAGIC = b"ARTIDX01"
+_HEADER = struct.Struct("<8sQQqQ")
+
+
+def index_path(path):
+    """Where the index of the file at path is kept."""
+    return path + INDEX_SUFFIX
+
+
+def _jsonl_spans(buf):
+    """Yield (start, end) byte offsets of each non-blank line of a mapped JSON Lines file."""
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b"\n", pos)
+        if end < 0:
+            end = size
+        if buf[pos:end].strip():
+            yield pos, end
+        pos = end + 1
+
+
+def scan_spans(path, fmt):
+    """List of (start, end) byte offsets of the articles in uncompressed file path."""
+    if split_compression(path)[1]:
+        raise ValueError(f"Cannot index compressed file {path}; decompress it first")
+    if fmt == "jsonl":
+        if os.path.getsize(path) == 0:
+            return []
+        buf = map_file(path)
+        try:
+            return list(_jsonl_spans(buf))
+        finally:
+            buf.close()
+    with MappedEnvelope(path) as mapped:
+        return list(mapped.spans())
+
+
+class ArticleIndex:
+    """
+    Byte ranges of the articles of one file: len(index) articles, span(n) is the
+    (start, end) offset pair of article n (from 0; negative counts from the end).
+    """
+
+    def __init__(self, fmt, size, mtime_ns, offsets):
+        self.fmt = fmt
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._offsets = offsets  # array('Q'): offset, length, offset, length, ...
+
+    @classmethod
+    def from_spans(cls, path, fmt, spans):
+        st = os.stat(path)
+        offsets = array("Q")
+        for start, end in spans:
+            offsets.append(start)
+            offsets.append(end - start)
+        return cls(fmt, st.st_size, st.st_mtime_ns, offsets)
+
+    def __len__(self):
+        return len(self._offsets) // 2
+
+    def span(self, n):
+        """(start, end) byte offsets of article n."""
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(f"article {n} is out of range; the file has {len(self)} articles")
+        start = self._offsets[2 * n]
+        return start, start + self._offsets[2 * n + 1]
+
+    def spans(self, first=0):
+        """Yield (start, end) of each article from article first on."""
+        offsets = self._offsets
+        for i in range(2 * first, len(offsets), 2):
+            yield offsets[i], offsets[i] + offsets[i + 1]
+
+    def matches(self, path):
+        """True if the file at path still has the size and modification time that were indexed."""
+        st = os.stat(path)
+        return (st.st_size, st.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    def save(self, path):
+        """Write the index to path (atomically)."""
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        header = _HEADER.pack(_MAGIC, FORMATS.index(self.fmt), self.size, self.mtime_ns, len(self))
+        with AtomicFile(path) as f:
+            f.write(header)
+            f.write(offsets.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save(). Raises ValueError if path is not an index file."""
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"{path} is not an article index")
+            _, fmt_code, size, mtime_ns, count = _HEADER.unpack(header)
+            offsets = array("Q")
+            try:
+                offsets.fromfile(f, 2 * count)
+            except EOFError:
+                raise ValueError(f"Article index {path} is truncated") from None
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        return cls(FORMATS[fmt_code], size, mtime_ns, offsets)
+
+
+def build_index(path, fmt=None):
+    """Scan the file at path, save its index to index_path(path) and return the ArticleIndex."""
+    fmt = detect_format(path, fmt)
+    index = ArticleIndex.from_spans(path, fmt, scan_spans(path, fmt))
+    index.save(index_path(path))
+    return index
+
+
+def load_index(path, fmt=None):
+    """
+    The saved index of the file at path. Raises FileNotFoundError if there is none and
+    ValueError if the file has changed since it was indexed or was indexed as another format.
+    """
+    index = ArticleIndex.load(index_path(path))
+    fmt = detect_format(path, fmt)
+    if index.fmt != fmt:
+        raise ValueError(f"{index_path(path)} indexes {path} as {index.fmt}, not {fmt}")
+    if not index.matches(path):
+        raise ValueError(f"{path} has changed since {index_path(path)} was built; rebuild it")
+    return index
+
+
+def find_index(path, fmt=None):
+    """load_index(path, fmt), or None if there is no usable index."""
+    try:
+        return load_index(path, fmt)
+    except (OSError, ValueError):
+        return None
+
+
+def read_article(path, n, index):
+    """Decode article n of the file at path using its ArticleIndex."""
+    start, end = index.span(n)
+    buf = map_file(path)
+    try:
+        return decode_span(buf, start, end)
+    finally:
+        buf.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a byte-offset index of an article file.")
+    parser.add_argument("input", nargs="?", default="sample_data.json")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="input file format (default: jsonl for .jsonl/.ndjson, else json)",
+    )
+    parser.add_argument(
+        "--show",
+        type=int,
+        action="append",
+        metavar="N",
+        help="print article N (counting from 0; repeatable), building the index only if it is missing or stale",
+    )
+    args = parser.parse_args(argv)
+
+    index = find_index(args.input, args.format) if args.show else None
+    if index is None:
+        try:
+            index = build_index(args.input, args.format)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Indexed {len(index)} articles in {index_path(args.input)}",
+              file=sys.stderr if args.show else sys.stdout)
+    for n in args.show or ():
+        try:
+            article = read_article(args.input, n, index)
+        except IndexError as e:
+            parser.error(str(e))
+        print(jsoncodec.dumps(article, pretty=True, default=to_json))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Async Pipeline
+# pipeline.run with its stages running concurrently under asyncio: a reader, a cleaning stage
+# that hands chunks of articles to an executor, a validation stage and a writer, connected by
+# bounded queues. Reading and writing happen in threads while cleaning runs in the executor,
+# and a full queue pauses the stage that feeds it, so at most a few chunks are held at once.
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import instrument
+from cleaner import (
+    check_mappable, chunk_articles, clean_chunk, clean_generated_at, lookup_chunk, merge_chunk,
+)
+from dataio import detect_format, make_writer, open_articles, open_text
+from mmapio import MappedEnvelope
+from validator import (
+    ValidationStats, add_near_duplicates, check_near_duplicate, write_partial, write_report,
+)
+
+
+# Chunks (of cleaner.CHUNK_TARGET_CHARS characters each) each queue holds before its producer waits.
+DEFAULT_QUEUE_SIZE = 4
+
+_DONE = object()  # put on a queue after the last item
+
+
+@contextmanager
+def _raw_articles(input_path, input_format, use_mmap):
+    """Yield (generated_at, iterator of the articles of input_path) without cleaning them."""
+    if use_mmap:
+        with MappedEnvelope(input_path) as mapped:
+            yield mapped.generated_at, iter(mapped)
+    else:
+        with open_articles(input_path, input_format) as (generated_at, articles):
+            yield generated_at, articles
+
+
+async def _read(chunks, read_queue):
+    """Read and decode chunks of articles in a thread and queue them."""
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        await read_queue.put(chunk)
+    await read_queue.put(_DONE)
+
+
+async def _clean(read_queue, clean_queue, executor, cache):
+    """
+    Submit each chunk's uncached articles to executor and queue the pending result in
+    input order. The queue's bound limits how many chunks are being cleaned at once.
+    """
+    loop = asyncio.get_running_loop()
+    while (chunk := await read_queue.get()) is not _DONE:
+        keys, cached, misses = lookup_chunk(chunk, cache)
+        await clean_queue.put((keys, cached, loop.run_in_executor(executor, clean_chunk, misses)))
+    await clean_queue.put(_DONE)
+
+
+async def _validate(clean_queue, write_queue, stats, cache, dedup, near_dup):
+    """Wait for each cleaned chunk in order, validate it and queue its valid articles."""
+    while (item := await clean_queue.get()) is not _DONE:
+        keys, cached, pending = item
+        valid = []
+        for article in merge_chunk(keys, cached, await pending, cache):
+            if stats.add(article, dedup)[0]:
+                valid.append(article)
+                check_near_duplicate(article, near_dup)
+        await write_queue.put(valid)
+    await write_queue.put(_DONE)
+
+
+def _write_chunk(writer, articles):
+    for article in articles:
+        writer.write(article)
+
+
+async def _write(write_queue, writer):
+    """Write each chunk of valid articles in a thread, then finish the file."""
+    while (articles := await write_queue.get()) is not _DONE:
+        await asyncio.to_thread(_write_chunk, writer, articles)
+    await asyncio.to_thread(writer.close)
+
+
+async def _run_stages(articles, writer, executor, workers, stats, cache, dedup, near_dup, queue_size):
+    read_queue = asyncio.Queue(queue_size)
+    # Enough chunks in flight to keep every worker busy.
+    clean_queue = asyncio.Queue(max(queue_size, 2 * workers))
+    write_queue = asyncio.Queue(queue_size)
+    await asyncio.gather(
+        _read(chunk_articles(articles), read_queue),
+        _clean(read_queue, clean_queue, executor, cache),
+        _validate(clean_queue, write_queue, stats, cache, dedup, near_dup),
+        _write(write_queue, writer),
+    )
+
+
+def run_async(input_path, output_path, report_path, workers=1, fmt=None, cache=None, dedup=None,
+              near_dup=None, partial_path=None, compact=False, compress_level=None, use_mmap=False,
+              queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Same as pipeline.run (without checkpoints), with reading, cleaning, validation and
+    writing overlapped. Cleaning runs in a pool of workers processes, or in one thread
+    when workers is 1. Each queue between two stages holds at most queue_size chunks
+    (the one holding chunks being cleaned, at least 2 * workers).
+    Returns the validation result dict; the output files are the same as pipeline.run's.
+    """
+    if queue_size < 1:
+        raise ValueError("queue size must be at least 1")
+    input_format = detect_format(input_path, fmt)
+    output_format = detect_format(output_path, fmt)
+    if use_mmap:
+        check_mappable(input_path, input_format)
+    stats = ValidationStats()
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    with executor, _raw_articles(input_path, input_format, use_mmap) as (generated_at, articles), \
+            open_text(output_path, "w", compress_level) as fout:
+        writer = make_writer(fout, output_format, clean_generated_at(generated_at), compact=compact)
+        asyncio.run(_run_stages(articles, writer, executor, workers, stats, cache, dedup, near_dup,
+                                queue_size))
+
+    result = add_near_duplicates(stats.result(), near_dup)
+    with instrument.stage("write_report"):
+        write_report(result, report_path)
+    if partial_path:
+        write_partial(stats, partial_path)
+    return result
+
+
+def add_async_arguments(parser):
+    """Add the --async and --queue-size options of pipeline.py."""
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="overlap reading, cleaning, validation and writing (asyncio stages with bounded queues)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        metavar="N",
+        help=f"chunks of articles buffered between --async stages (default: {DEFAULT_QUEUE_SIZE})",
+    )
@@ -0,0 +1,79 @@
+# Date Parsing Benchmark
+# Compares parse_date_to_iso with the memoized, format-learning DateParser on a feed-like
+# mix of date strings. Run from the repo root: python3 -m benchmarks.bench_dates
+
+import argparse
+import random
+import time
+
+from cleaner import DateParser, parse_date_to_iso
+
+
+# Date strings in the formats found in sample_data.json.
+SAMPLE_DATES = (
+    "2026-02-02T02:30:50-05:00",
+    "2026-Feb-01T13:28:27-05:00",
+    "Updated Jan. 26, 2026",
+    "January 26, 2026",
+    "not a date",
+)
+
+
+def make_dates(count, distinct, formats=SAMPLE_DATES, seed=0):
+    """count date strings drawn from `distinct` different timestamps in the given formats."""
+    rng = random.Random(seed)
+    pool = []
+    for i in range(distinct):
+        fmt = formats[i % len(formats)]
+        day = 1 + i % 28
+        hour = i % 24
+        if fmt.startswith("2026-02"):
+            pool.append(f"2026-02-{day:02d}T{hour:02d}:{i % 60:02d}:50-05:00")
+        elif fmt.startswith("2026-Feb"):
+            pool.append(f"2026-Feb-{day:02d}T{hour:02d}:{i % 60:02d}:27-05:00")
+        elif fmt.startswith("Updated"):
+            pool.append(f"Updated Jan. {day}, 2026")
+        elif fmt.startswith("January"):
+            pool.append(f"January {day}, {2000 + i % 27}")
+        else:
+            pool.append(f"not a date {i}")
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def time_parser(parse, dates):
+    """Seconds taken to parse every string in dates."""
+    start = time.perf_counter()
+    for d in dates:
+        parse(d)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark date parsing.")
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    feeds = (
+        ("mixed formats", SAMPLE_DATES),
+        ("single format (Updated Jan. 26, 2026)", ("Updated Jan. 26, 2026",)),
+    )
+    for name, formats in feeds:
+        dates = make_dates(args.count, args.distinct, formats)
+        check = DateParser()
+        assert [parse_date_to_iso(d) for d in dates[:10_000]] == [check.parse(d) for d in dates[:10_000]]
+
+        date_parser = DateParser()
+        baseline = time_parser(parse_date_to_iso, dates)
+        uncached = time_parser(DateParser(cache_size=0).parse, dates)
+        memoized = time_parser(date_parser.parse, dates)
+
+        print(f"{name}: {args.count} dates, up to {args.distinct} distinct")
+        print(f"  parse_date_to_iso:      {args.count / baseline:12,.0f} dates/s")
+        print(f"  DateParser (no cache):  {args.count / uncached:12,.0f} dates/s  ({baseline / uncached:.1f}x)")
+        print(f"  DateParser:             {args.count / memoized:12,.0f} dates/s  ({baseline / memoized:.1f}x)")
+        print(f"  {date_parser.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# JSON Backend Benchmark
+# Compares the jsoncodec backends (orjson, ujson, json) writing a benchmark corpus, pretty and
+# compact, and each library's decoder reading it. Run from the repo root: python3 -m benchmarks.bench_json
+
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+import jsoncodec
+from article import to_json
+from benchmarks.corpus import write_corpus
+from dataio import load_data
+
+
+def best_of(repeat, func):
+    """Fastest of repeat timed calls of func(), in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends.")
+    parser.add_argument("corpus", nargs="?", help="JSON corpus (default: a generated one)")
+    parser.add_argument("--count", type=int, default=20_000, help="articles in the generated corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.corpus
+        if path is None:
+            path = os.path.join(workdir, "corpus.json")
+            write_corpus(path, args.count, 0, "json")
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        with open(path, "r", encoding="utf-8") as f:
+            data = load_data(f, "json")
+
+    mb = len(text.encode("utf-8")) / 1e6
+    print(f"{path if args.corpus else 'generated corpus'}: {len(data['articles'])} articles, {mb:.1f} MB")
+    baseline = {}
+    for name in reversed(jsoncodec.available_backends()):
+        jsoncodec.set_backend(name)
+        loads = importlib.import_module(name).loads
+        timings = (
+            ("load", best_of(args.repeat, lambda: loads(text))),
+            ("dump pretty", best_of(args.repeat, lambda: jsoncodec.dumps(data, True, to_json))),
+            ("dump compact", best_of(args.repeat, lambda: jsoncodec.dumps(data, False, to_json))),
+        )
+        print(f"  {name}:")
+        for task, seconds in timings:
+            baseline.setdefault(task, seconds)
+            print(f"    {task:<13} {mb / seconds:8.1f} MB/s  ({baseline[task] / seconds:.1f}x json)")
+    jsoncodec.set_backend()
+
+
+if __name__ == "__main__":
+    main()
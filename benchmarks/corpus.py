@@ -0,0 +1,150 @@
+# Synthetic Corpus
+# Generates scraped-article corpora with the same kinds of dirt as sample_data.json, at any size.
+# Run from the repo root: python3 -m benchmarks.corpus corpus.json --count 1M
+
+import argparse
+import random
+
+from dataio import detect_format, make_writer, open_text
+
+
+WORDS = (
+    "the of and to in a is that for on with as was by at from his her their said "
+    "president government federal court officials administration company market "
+    "report investment technology artificial intelligence china trump tariffs budget "
+    "lawsuit policy economy documentary reconstruction regulation billion percent "
+    "according statement announced sunday monday leader party country industry"
+).split()
+
+INVISIBLE = ("\u00a0", "\u200b", "\u200c", "\u200d", "\ufeff")
+ENTITIES = ("&nbsp;", "&amp;", "&quot;", "&#8217;", "&rsquo;", "&copy;", "&trade;")
+TAGS = ("<p>", "</p>", "<br>", "<br/>", "<b>", "</b>", '<a href="https://example.com">', "</a>")
+CONTROL = ("\x00", "\x01", "\x07", "\x1b", "\x7f")
+SPECIAL = ("©", "®", "™", "’", "“", "”")
+# One in eight URLs has a broken or missing scheme, like the htps:// and htttps:// in sample_data.json.
+URL_SCHEMES = ("https://",) * 12 + ("http://", "htps://", "htttps://", "")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
+def parse_count(text):
+    """Parse a record count such as 1000, 10k or 10M."""
+    text = text.strip().lower().replace("_", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def _dirty_words(rng, count):
+    """count words with occasional whitespace runs, tags, entities and invisible characters."""
+    parts = []
+    for _ in range(count):
+        parts.append(rng.choice(WORDS))
+        r = rng.random()
+        if r < 0.02:
+            parts.append(rng.choice(TAGS))
+        elif r < 0.04:
+            parts.append(rng.choice(ENTITIES))
+        elif r < 0.06:
+            parts.append(rng.choice(INVISIBLE))
+        elif r < 0.07:
+            parts.append(rng.choice(SPECIAL))
+        elif r < 0.075:
+            parts.append(rng.choice(CONTROL))
+        elif r < 0.09:
+            parts.append("  \n\t")
+        else:
+            parts.append(" ")
+    return "".join(parts)
+
+
+def _date(rng):
+    """A published value in one of the formats seen in scraped feeds (or missing/garbage)."""
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    time_of_day = f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+    r = rng.random()
+    if r < 0.6:
+        return f"2026-{month:02d}-{day:02d}T{time_of_day}-05:00"
+    if r < 0.7:
+        return f"2026-{MONTHS[month - 1]}-{day:02d}T{time_of_day}-05:00"
+    if r < 0.8:
+        return f"Updated {MONTHS[month - 1]}. {day}, 2026"
+    if r < 0.85:
+        return f"{MONTH_NAMES[month - 1]} {day}, 2026"
+    if r < 0.9:
+        return f"2026-{month:02d}-{day:02d}T{time_of_day}Z"
+    if r < 0.95:
+        return "yesterday"
+    return None
+
+
+def generate_article(rng, index):
+    """One raw article dict. Roughly 30% fail validation after cleaning."""
+    slug = "-".join(rng.choice(WORDS) for _ in range(4))
+    url = f"{rng.choice(URL_SCHEMES)}www.example-news.com/2026/{index % 12 + 1:02d}/{slug}-{index}.html"
+    if rng.random() < 0.05:
+        url = "  " + url + "\u200b "
+
+    title = _dirty_words(rng, rng.randint(4, 14)).strip()
+    r = rng.random()
+    if r < 0.05:
+        title = ""
+    elif r < 0.25:
+        title = "<h1>" + title + "</h1>"
+
+    # Mostly a few hundred words, with a long tail of very long bodies and some stubs.
+    r = rng.random()
+    if r < 0.05:
+        words = rng.randint(1, 6)
+    elif r < 0.95:
+        words = rng.randint(60, 900)
+    else:
+        words = rng.randint(2000, 8000)
+    content = _dirty_words(rng, words)
+    if rng.random() < 0.3:
+        content = "<p>" + content + "</p>"
+
+    article = {"url": url, "title": title, "content": content, "published": _date(rng)}
+    if rng.random() < 0.02:
+        del article[rng.choice(("url", "title", "content"))]
+    return article
+
+
+def generate_articles(count, seed=0):
+    """Yield count synthetic raw articles; the same seed always yields the same corpus."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield generate_article(rng, index)
+
+
+def write_corpus(path, count, seed=0, fmt=None):
+    """
+    Write a corpus of count articles to path as JSON or JSON Lines, one article at a time
+    (compressed if path ends in .gz, .bz2, .xz or .zst).
+    """
+    with open_text(path, "w") as f:
+        writer = make_writer(f, detect_format(path, fmt), "2026-02-02T07:35:09Z")
+        for article in generate_articles(count, seed):
+            writer.write(article)
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic scraped-article corpus.")
+    parser.add_argument("output", help="output file (.json, or .jsonl for JSON Lines)")
+    parser.add_argument("--count", type=parse_count, default=1000, help="articles, e.g. 1k, 10M (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    write_corpus(args.output, args.count, args.seed)
+    print(f"Wrote {args.count} articles -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Benchmark Harness
+# Measures throughput of the cleaning and validation hot paths on synthetic corpora and saves
+# the results as JSON so runs can be compared. Run from the repo root:
+#   python3 -m benchmarks.run --sizes 1k,100k --output bench.json [--compare previous.json]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from article import RECORD_TYPES, Article
+from benchmarks.corpus import generate_articles, parse_count, write_corpus
+import columnar
+from columnar import ArticleBatch, validate_batch
+from cleaner import DateParser, clean_article, clean_text, parse_date_to_iso
+from pipeline import run as run_pipeline
+from validator import validate_record
+
+
+# Per-function benchmarks hold their input in memory, so they use at most this many articles
+# from each corpus; the end-to-end pipeline benchmark streams the full size from disk.
+DEFAULT_SAMPLE_LIMIT = 100_000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _utf8_size(value):
+    return len(value.encode("utf-8")) if isinstance(value, str) else 0
+
+
+def _article_bytes(article):
+    if not isinstance(article, RECORD_TYPES):
+        return 0
+    return sum(_utf8_size(article.get(k)) for k in ("url", "title", "content", "published"))
+
+
+def measure(name, size, func, items, records, nbytes):
+    """Run func(item) for every item and return a result dict."""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    seconds = time.perf_counter() - start
+    return result_row(name, size, records, nbytes, seconds)
+
+
+def result_row(name, size, records, nbytes, seconds):
+    """One benchmark result with derived throughput figures."""
+    return {
+        "benchmark": name,
+        "corpus_size": size,
+        "records": records,
+        "bytes": nbytes,
+        "seconds": round(seconds, 6),
+        "records_per_s": round(records / seconds, 1) if seconds else None,
+        "mb_per_s": round(nbytes / seconds / 1e6, 3) if seconds else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_functions(size, sample_limit, seed):
+    """Per-function benchmarks on min(size, sample_limit) in-memory articles."""
+    articles = [Article.from_dict(a) for a in generate_articles(min(size, sample_limit), seed)]
+    records = len(articles)
+    texts = [a.get(k) for a in articles for k in ("title", "content")]
+    texts = [t for t in texts if isinstance(t, str)]
+    dates = [a.get("published") for a in articles]
+    raw_bytes = sum(_article_bytes(a) for a in articles)
+
+    rows = [
+        measure("clean_text", size, clean_text, texts, len(texts), sum(_utf8_size(t) for t in texts)),
+        measure("parse_date_to_iso", size, parse_date_to_iso, dates, records,
+                sum(_utf8_size(d) for d in dates)),
+        measure("DateParser.parse", size, DateParser().parse, dates, records,
+                sum(_utf8_size(d) for d in dates)),
+        measure("clean_article", size, clean_article, articles, records, raw_bytes),
+    ]
+    cleaned = [clean_article(a) for a in articles]
+    cleaned_bytes = sum(_article_bytes(a) for a in cleaned)
+    rows.append(measure("validate_record", size, validate_record, cleaned, records, cleaned_bytes))
+
+    start = time.perf_counter()
+    batch = ArticleBatch.from_articles(cleaned)
+    rows.append(result_row("ArticleBatch.build", size, records, cleaned_bytes, time.perf_counter() - start))
+    start = time.perf_counter()
+    validate_batch(batch, use_numpy=False)
+    rows.append(result_row("validate_batch", size, records, cleaned_bytes, time.perf_counter() - start))
+    if columnar.np is not None:
+        start = time.perf_counter()
+        validate_batch(batch, use_numpy=True)
+        rows.append(result_row("validate_batch[numpy]", size, records, cleaned_bytes,
+                               time.perf_counter() - start))
+    return rows
+
+
+def bench_pipeline(size, seed, workdir):
+    """End-to-end pipeline.run over a corpus file of the full size."""
+    input_path = os.path.join(workdir, f"corpus-{size}.json")
+    write_corpus(input_path, size, seed)
+    nbytes = os.path.getsize(input_path)
+    start = time.perf_counter()
+    run_pipeline(input_path, os.path.join(workdir, "valid.json"), os.path.join(workdir, "report.txt"))
+    seconds = time.perf_counter() - start
+    os.remove(input_path)
+    return result_row("pipeline.run", size, size, nbytes, seconds)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_rows(rows, previous=None):
+    """Print results as a table, with the speed ratio against previous results if given."""
+    before = {}
+    for row in (previous or {}).get("results", []):
+        before[(row["benchmark"], row["corpus_size"])] = row
+    print(f"{'benchmark':<22} {'size':>10} {'records/s':>14} {'MB/s':>9} {'peak RSS MB':>12}  vs previous")
+    for row in rows:
+        old = before.get((row["benchmark"], row["corpus_size"]))
+        ratio = ""
+        if old and old.get("records_per_s") and row["records_per_s"]:
+            ratio = f"{row['records_per_s'] / old['records_per_s']:.2f}x"
+        print(f"{row['benchmark']:<22} {row['corpus_size']:>10} {row['records_per_s']:>14,.0f} "
+              f"{row['mb_per_s']:>9.2f} {row['peak_rss_mb']:>12.1f}  {ratio}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cleaning and validation.")
+    parser.add_argument("--sizes", default="1k,10k", help="comma-separated corpus sizes, e.g. 1k,1M,10M")
+    parser.add_argument("--sample-limit", type=parse_count, default=DEFAULT_SAMPLE_LIMIT,
+                        help=f"max articles held in memory for per-function benchmarks "
+                             f"(default: {DEFAULT_SAMPLE_LIMIT})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-pipeline", action="store_true", help="only run per-function benchmarks")
+    parser.add_argument("--workdir", help="directory for generated corpus files (default: a temp dir)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_count(s) for s in args.sizes.split(",") if s.strip()]
+    rows = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        for size in sizes:
+            rows.extend(bench_functions(size, args.sample_limit, args.seed))
+            if not args.skip_pipeline:
+                rows.append(bench_pipeline(size, args.seed, workdir))
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    print_rows(rows, previous)
+
+    if args.output:
+        results = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "sample_limit": args.sample_limit,
+            "results": rows,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
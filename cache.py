@@ -0,0 +1,125 @@
+# Clean Cache
+# On-disk cache of cleaned articles keyed by a hash of the raw article, so articles
+# seen in an earlier run are not cleaned again.
+
+import hashlib
+import json
+import sqlite3
+
+from article import RECORD_TYPES, Article
+
+
+# Default number of cached articles kept; least recently used entries are evicted beyond it.
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# SQLite limits the number of bound parameters per statement.
+_BATCH_SIZE = 500
+
+_CACHED_FIELDS = ("url", "title", "content", "published")
+
+
+def article_key(article):
+    """
+    Hash of the raw url/title/content/published values of an article (Article or dict),
+    or None for anything clean_article does not clean.
+    """
+    if not isinstance(article, RECORD_TYPES):
+        return None
+    raw = json.dumps([article.get(k) for k in _CACHED_FIELDS], ensure_ascii=False, default=repr)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+class CleanCache:
+    """
+    SQLite-backed cache of cleaned articles with least-recently-used eviction.
+    version identifies the cleaning rules; opening a cache written under a different
+    version discards all of its entries. Counts hits and misses for the current run.
+    """
+
+    def __init__(self, path, version, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key BLOB PRIMARY KEY, value TEXT NOT NULL, used INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != version:
+            self.db.execute("DELETE FROM entries")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+        self.db.commit()
+
+        self.size, last_used = self.db.execute(
+            "SELECT COUNT(*), COALESCE(MAX(used), 0) FROM entries"
+        ).fetchone()
+        self._clock = last_used
+
+    def get_many(self, keys):
+        """Return {key: cleaned Article} for the keys that are cached, marking them as used."""
+        requested = list(keys)
+        keys = list(dict.fromkeys(requested))
+        found = {}
+        for i in range(0, len(keys), _BATCH_SIZE):
+            batch = keys[i:i + _BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.db.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, value in rows:
+                found[key] = Article(*json.loads(value))
+        if found:
+            self._clock += 1
+            self.db.executemany(
+                "UPDATE entries SET used = ? WHERE key = ?",
+                [(self._clock, key) for key in found],
+            )
+        hits = sum(1 for key in requested if key in found)
+        self.hits += hits
+        self.misses += len(requested) - hits
+        return found
+
+    def put_many(self, items):
+        """Store {key: cleaned Article}, evicting the least recently used entries if full."""
+        if not items:
+            return
+        self._clock += 1
+        cursor = self.db.executemany(
+            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?)",
+            [
+                (key, json.dumps([value.url, value.title, value.content, value.published], ensure_ascii=False),
+                 self._clock)
+                for key, value in items.items()
+            ],
+        )
+        self.size += cursor.rowcount
+        if self.size > self.max_entries:
+            excess = self.size - self.max_entries
+            self.db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+            self.size -= excess
+        self.db.commit()
+
+    def hit_rate(self):
+        """Fraction of lookups this run that were served from the cache (0 if none)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        """One-line hit rate summary for the end of a run."""
+        lookups = self.hits + self.misses
+        return f"Cache: {self.hits} of {lookups} articles served from cache ({100.0 * self.hit_rate():.2f}%)"
+
+    def close(self):
+        """Commit and close the database."""
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,107 @@
+# Checkpoints
+# Saves the progress of a long streaming run every so many articles, so a run that dies
+# part-way can be restarted and continue where it stopped instead of starting over.
+
+import json
+import os
+
+
+# Articles processed between checkpoints.
+DEFAULT_EVERY = 10_000
+
+# Bumped whenever the checkpoint file layout changes.
+_FORMAT_VERSION = 2
+
+
+def _write_atomic(path, data):
+    """Replace the file at path with bytes data so readers see either the old or the new file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _remove(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def file_identity(path):
+    """Absolute path, size and modification time of path, to detect a changed input."""
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def open_output(path, state):
+    """
+    Open text file path for writing: from scratch when state is None, else cut back to
+    the size recorded in checkpoint state and opened for appending.
+    """
+    if state is None:
+        return open(path, "w", encoding="utf-8")
+    os.truncate(path, state["output_bytes"])
+    return open(path, "a", encoding="utf-8")
+
+
+class Checkpoint:
+    """
+    Progress of one streaming run, kept in a small JSON file at path: how many input
+    articles were processed, how many bytes and articles had been written to the output
+    at that point, and the validator counters. Nothing else is saved, so a checkpoint
+    costs the same however long the run is; state such as the URL dedup table is rebuilt
+    from the output on resume (see pipeline.run). A checkpoint belongs to one run:
+    loading it for different input, output or settings raises ValueError.
+    """
+
+    def __init__(self, path, every=DEFAULT_EVERY):
+        if every < 1:
+            raise ValueError("checkpoint interval must be at least 1 article")
+        self.path = path
+        self.every = every
+        self.identity = None
+
+    def load(self, identity):
+        """
+        Start a run described by identity (a JSON-serializable dict). Returns the saved
+        state dict if a checkpoint for the same run exists, else None. The state has
+        articles_read, output_bytes, written and counters.
+        """
+        self.identity = identity
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != _FORMAT_VERSION or state.get("identity") != identity:
+            raise ValueError(
+                f"Checkpoint {self.path} was written for a different input, output or settings; "
+                "delete it to start over"
+            )
+        return state
+
+    def due(self, articles_read):
+        """True when a checkpoint should be saved after articles_read articles."""
+        return articles_read % self.every == 0
+
+    def save(self, output_file, articles_read, written, counters):
+        """
+        Flush and fsync text file output_file, then record the run's progress.
+        counters is a JSON-serializable dict. The checkpoint file is replaced last,
+        so a crash while saving leaves the previous checkpoint in effect.
+        """
+        output_file.flush()
+        os.fsync(output_file.fileno())
+        state = {
+            "version": _FORMAT_VERSION,
+            "identity": self.identity,
+            "articles_read": articles_read,
+            "output_bytes": output_file.buffer.tell(),
+            "written": written,
+            "counters": counters,
+        }
+        _write_atomic(self.path, json.dumps(state, indent=2).encode("utf-8"))
+
+    def remove(self):
+        """Delete the checkpoint once the run has finished."""
+        _remove(self.path)
@@ -1,11 +1,27 @@
 # Data Cleaning
 # Cleans article data: whitespace, HTML, encoding, dates, control characters.
 
+import argparse
+import functools
+import hashlib
 import html
-import json
+import itertools
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import instrument
+import jsoncodec
+from article import RECORD_TYPES, Article, to_json
+from articleindex import find_index
+from cache import DEFAULT_MAX_ENTRIES, CleanCache, article_key
+from dataio import (
+    FORMATS, add_compression_argument, detect_format, load_data, make_writer, open_articles, open_text,
+    read_articles, split_compression,
+)
+from mmapio import MappedEnvelope, decode_span, release, release_behind, shared_map
+
 
 # Invisible / problematic characters to replace with normal space (e.g. non-breaking space).
 INVISIBLE_TO_SPACE = (
@@ -16,6 +32,31 @@ INVISIBLE_TO_SPACE = (
     "\ufeff",   # BOM
 )
 
+# Non-ISO date formats tried by parse_date_to_iso, in order.
+ISO_MONTH_NAME_FORMAT = "%Y-%b-%dT%H:%M:%S"   # 2026-Feb-01T13:28:27-05:00
+SHORT_MONTH_FORMAT = "%b. %d, %Y"             # Jan. 26, 2026
+LONG_MONTH_FORMAT = "%B %d, %Y"               # January 26, 2026
+DATE_FORMATS = (ISO_MONTH_NAME_FORMAT, SHORT_MONTH_FORMAT, LONG_MONTH_FORMAT)
+
+# Number of distinct raw date strings whose parsed value DateParser remembers.
+DATE_CACHE_SIZE = 4096
+
+# Bump whenever the cleaning logic changes output, so cached results are discarded.
+CLEANING_RULES_VERSION = 2
+
+# Inputs with fewer characters than this are cleaned serially even when workers > 1,
+# because starting a process pool would cost more than it saves.
+PARALLEL_MIN_CHARS = 1 << 21
+# Approximate number of characters of article text sent to a worker per task.
+CHUNK_TARGET_CHARS = 1 << 18
+
+
+# Patterns used by clean_text, compiled once at import time.
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+# ASCII control characters except tab, newline, carriage return; plus DEL (0x7f).
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]+")
+
 
 def clean_text(value):
     """
@@ -30,26 +71,71 @@ def clean_text(value):
 
     # Replace problematic invisible characters with normal space
     for char in INVISIBLE_TO_SPACE:
-        s = s.replace(char, " ")
+        if char in s:
+            s = s.replace(char, " ")
 
     # Decode HTML entities (e.g. &nbsp; &amp; &quot;) to plain text
-    s = html.unescape(s)
+    if "&" in s:
+        s = html.unescape(s)
 
     # Remove HTML tags (e.g. <p>, <br>, <h1>)
-    s = re.sub(r"<[^>]+>", "", s)
+    if "<" in s:
+        s = _TAG_RE.sub("", s)
 
     # Strip leading/trailing whitespace and collapse internal whitespace to single space
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WHITESPACE_RE.sub(" ", s).strip()
+
+    # Remove ASCII control characters (keep tab, newline, carriage return) and DEL (0x7f).
+    # This must run after the whitespace collapse so the output matches exactly.
+    return _CONTROL_RE.sub("", s)
+
+
+_UPDATED_PREFIX_RE = re.compile(r"^Updated\s+", re.IGNORECASE)
 
-    # Remove ASCII control characters (keep tab, newline, carriage return)
-    s = "".join(
-        c for c in s
-        if ord(c) >= 32 or c in "\t\n\r"
-    )
-    # Remove DEL (0x7f)
-    s = "".join(c for c in s if ord(c) != 127)
 
-    return s
+def _parse_iso(s):
+    """ISO 8601, e.g. 2026-02-02T02:30:50-05:00 or 2026-02-02T07:35:09Z."""
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+        return dt.isoformat()
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_iso_month_name(s):
+    """"2026-Feb-01T13:28:27-05:00" style (month name), keeping the UTC offset."""
+    try:
+        dt = datetime.strptime(s[:20], ISO_MONTH_NAME_FORMAT)
+    except (ValueError, TypeError):
+        return None
+    iso = dt.strftime("%Y-%m-%dT%H:%M:%S")
+    if len(s) > 20 and s[20] in "-+" and len(s) >= 26:
+        iso += s[20:26] if len(s) > 25 and s[23] == ":" else s[20:23] + ":" + s[23:25]
+    return iso
+
+
+def _month_day_year_parser(fmt):
+    """Parser for "[Updated ]<month> <day>, <year>" dates in the given strptime format."""
+    def parse(s):
+        prefix_removed = _UPDATED_PREFIX_RE.sub("", s).strip()
+        for candidate in (prefix_removed, s):
+            try:
+                dt = datetime.strptime(candidate, fmt)
+                return dt.strftime("%Y-%m-%dT%H:%M:%S")
+            except (ValueError, TypeError):
+                pass
+        return None
+    return parse
+
+
+# Date parsers in the order parse_date_to_iso tries them; each returns None on failure.
+# No string is accepted by more than one of them, so the order never changes a result.
+_DATE_PARSERS = (
+    _parse_iso,
+    _parse_iso_month_name,
+    _month_day_year_parser(SHORT_MONTH_FORMAT),   # "Updated Jan. 26, 2026" or "Jan. 26, 2026"
+    _month_day_year_parser(LONG_MONTH_FORMAT),    # "January 26, 2026"
+)
 
 
 def parse_date_to_iso(date_str):
@@ -64,45 +150,69 @@ def parse_date_to_iso(date_str):
     if not s:
         return ""
 
-    # Try ISO format first (e.g. 2026-02-02T02:30:50-05:00)
-    try:
-        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
-        return dt.isoformat()
-    except (ValueError, TypeError):
-        pass
+    for parser in _DATE_PARSERS:
+        iso = parser(s)
+        if iso is not None:
+            return iso
+    return ""
 
-    # Try "2026-Feb-01T13:28:27-05:00" style (month name)
-    try:
-        dt = datetime.strptime(s[:20], "%Y-%b-%dT%H:%M:%S")
-        iso = dt.strftime("%Y-%m-%dT%H:%M:%S")
-        if len(s) > 20 and s[20] in "-+" and len(s) >= 26:
-            iso += s[20:26] if len(s) > 25 and s[23] == ":" else s[20:23] + ":" + s[23:25]
-        return iso
-    except (ValueError, TypeError):
-        pass
 
-    # Try "Updated Jan. 26, 2026" or "Jan. 26, 2026"
-    prefix_removed = re.sub(r"^Updated\s+", "", s, flags=re.IGNORECASE).strip()
-    for candidate in (prefix_removed, s):
-        try:
-            dt = datetime.strptime(candidate, "%b. %d, %Y")
-            return dt.strftime("%Y-%m-%dT%H:%M:%S")
-        except (ValueError, TypeError):
-            try:
-                dt = datetime.strptime(candidate, "%B %d, %Y")
-                return dt.strftime("%Y-%m-%dT%H:%M:%S")
-            except (ValueError, TypeError):
-                pass
+class DateParser:
+    """
+    Same results as parse_date_to_iso, faster on real feeds: the format that matched
+    last is tried first, and results are memoized in an LRU cache of cache_size
+    raw strings, since timestamps repeat heavily within a feed.
+    """
 
-    return ""
+    def __init__(self, cache_size=DATE_CACHE_SIZE):
+        self._last = _DATE_PARSERS[0]
+        self._cached_parse = functools.lru_cache(maxsize=cache_size)(self._parse)
+
+    def parse(self, date_str):
+        """Drop-in replacement for parse_date_to_iso(date_str)."""
+        if not date_str or not isinstance(date_str, str):
+            return ""
+        return self._cached_parse(date_str)
+
+    def _parse(self, date_str):
+        s = date_str.strip()
+        if not s:
+            return ""
+        last = self._last
+        iso = last(s)
+        if iso is not None:
+            return iso
+        for parser in _DATE_PARSERS:
+            if parser is not last:
+                iso = parser(s)
+                if iso is not None:
+                    self._last = parser
+                    return iso
+        return ""
+
+    def cache_info(self):
+        """functools cache statistics (hits, misses, maxsize, currsize)."""
+        return self._cached_parse.cache_info()
+
+
+def cleaning_rules_version():
+    """
+    Key identifying the current cleaning rules (for cache invalidation). Changes when
+    INVISIBLE_TO_SPACE, DATE_FORMATS or CLEANING_RULES_VERSION change.
+    """
+    rules = repr((CLEANING_RULES_VERSION, INVISIBLE_TO_SPACE, DATE_FORMATS))
+    return hashlib.sha256(rules.encode("utf-8")).hexdigest()
+
+
+_date_parser = DateParser()
 
 
 def clean_article(article):
     """
-    Clean one article dict: url, title, content, published.
-    Preserves all keys; missing fields become empty strings. Never removes the record.
+    Clean one article (Article or dict): url, title, content, published.
+    Returns an Article; missing fields become empty strings. Never removes the record.
     """
-    if not isinstance(article, dict):
+    if not isinstance(article, RECORD_TYPES):
         return article
 
     url = article.get("url")
@@ -117,57 +227,363 @@ def clean_article(article):
     content = clean_text(article.get("content"))
     published = article.get("published")
     if published is not None and isinstance(published, str):
-        published = parse_date_to_iso(published)
+        published = _date_parser.parse(published)
     else:
         published = ""
 
-    return {
-        "url": url,
-        "title": title,
-        "content": content,
-        "published": published,
-    }
+    return Article(url, title, content, published)
+
 
+def _article_size(article):
+    """Approximate cleaning cost of an article: total length of its string fields."""
+    if not isinstance(article, RECORD_TYPES):
+        return 1
+    fields = (article.get("url"), article.get("title"), article.get("content"), article.get("published"))
+    return sum(len(v) for v in fields if isinstance(v, str)) or 1
 
-def clean(data):
+
+def chunk_articles(articles, target_chars=None):
     """
-    Clean full input data (dict with 'generated_at' and 'articles').
-    Same number of records; preserves structure. Output is UTF-8 safe.
+    Group articles into lists of roughly target_chars (default CHUNK_TARGET_CHARS)
+    characters each, keeping order.
     """
-    if not isinstance(data, dict):
-        return data
-
-    generated_at = data.get("generated_at")
+    if target_chars is None:
+        target_chars = CHUNK_TARGET_CHARS
+    chunk = []
+    size = 0
+    for article in articles:
+        chunk.append(article)
+        size += _article_size(article)
+        if size >= target_chars:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def clean_chunk(chunk):
+    """Worker task: clean a list of articles."""
+    return [clean_article(a) for a in chunk]
+
+
+def lookup_chunk(chunk, cache):
+    """
+    Split a chunk into cached results and articles that still need cleaning.
+    Returns (keys, cached, misses); keys and cached are None without a cache.
+    """
+    if cache is None:
+        return None, None, chunk
+    keys = [article_key(a) for a in chunk]
+    cached = cache.get_many(k for k in keys if k is not None)
+    misses = [a for a, k in zip(chunk, keys) if k not in cached]
+    return keys, cached, misses
+
+
+def merge_chunk(keys, cached, cleaned, cache):
+    """Return a chunk's results in input order, storing newly cleaned articles in cache."""
+    if cache is None:
+        return cleaned
+    cleaned = iter(cleaned)
+    results = []
+    new_entries = {}
+    for key in keys:
+        if key in cached:
+            results.append(cached[key])
+        else:
+            article = next(cleaned)
+            results.append(article)
+            if key is not None:
+                new_entries[key] = article
+    cache.put_many(new_entries)
+    return results
+
+
+def iter_clean(articles, workers=1, cache=None):
+    """
+    Yield clean_article(a) for each article, in input order.
+    With workers > 1, chunks of articles are cleaned in a process pool; at most
+    2 * workers chunks are in flight, so a lazy input is never read ahead further.
+    Input smaller than PARALLEL_MIN_CHARS is cleaned serially.
+    With a CleanCache, previously cleaned articles are taken from it and new
+    results are added to it.
+    """
+    if workers <= 1 and cache is None:
+        for article in articles:
+            yield clean_article(article)
+        return
+
+    chunks = chunk_articles(articles)
+    pending = []
+    if workers > 1:
+        pending_size = 0
+        for chunk in chunks:
+            pending.append(chunk)
+            pending_size += sum(_article_size(a) for a in chunk)
+            if pending_size >= PARALLEL_MIN_CHARS:
+                break
+        else:
+            workers = 1
+
+    if workers <= 1:
+        for chunk in itertools.chain(pending, chunks):
+            keys, cached, misses = lookup_chunk(chunk, cache)
+            yield from merge_chunk(keys, cached, clean_chunk(misses), cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in itertools.chain(pending, chunks):
+            if len(in_flight) >= 2 * workers:
+                keys, cached, future = in_flight.popleft()
+                yield from merge_chunk(keys, cached, future.result(), cache)
+            keys, cached, misses = lookup_chunk(chunk, cache)
+            in_flight.append((keys, cached, executor.submit(clean_chunk, misses)))
+        del pending
+        while in_flight:
+            keys, cached, future = in_flight.popleft()
+            yield from merge_chunk(keys, cached, future.result(), cache)
+
+
+def _clean_spans(path, spans):
+    """Worker task: decode the articles at byte spans of the file at path and clean them."""
+    buf = shared_map(path)
+    cleaned = [clean_article(decode_span(buf, start, end)) for start, end in spans]
+    release(buf, spans[0][0], spans[-1][1])
+    return cleaned
+
+
+def _chunk_spans(spans, target_bytes=None):
+    """
+    Group (start, end) spans into lists covering roughly target_bytes (default
+    CHUNK_TARGET_CHARS) each, keeping order.
+    """
+    if target_bytes is None:
+        target_bytes = CHUNK_TARGET_CHARS
+    chunk = []
+    size = 0
+    for span in spans:
+        chunk.append(span)
+        size += span[1] - span[0]
+        if size >= target_bytes:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def iter_clean_mapped(mapped, workers=1, cache=None, skip=0):
+    """
+    iter_clean over the articles of a MappedEnvelope, after the first skip articles.
+    With workers > 1 (and no cache), workers are sent byte ranges rather than articles:
+    each maps the same file, decodes its own articles and sends back only the cleaned ones.
+    An up-to-date articleindex for the file is used instead of scanning for the ranges.
+    """
+    index = find_index(mapped.path, "json")
+    if index is not None:
+        spans = index.spans(skip)
+    else:
+        spans = itertools.islice(mapped.spans(), skip, None)
+    if workers <= 1 or cache is not None or len(mapped.buf) < PARALLEL_MIN_CHARS:
+        buf = mapped.buf
+        spans = release_behind(buf, spans)
+        yield from iter_clean((decode_span(buf, start, end) for start, end in spans), workers, cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in _chunk_spans(spans):
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+            in_flight.append(executor.submit(_clean_spans, mapped.path, chunk))
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def check_mappable(path, fmt):
+    """Raise ValueError unless path can be read with --mmap: an uncompressed JSON document."""
+    if fmt != "json" or split_compression(path)[1]:
+        raise ValueError(f"--mmap needs an uncompressed JSON (not JSON Lines) input file, not {path}")
+
+
+def clean_generated_at(generated_at):
+    """Normalize the top-level generated_at value the same way for every mode."""
     if generated_at is None:
         generated_at = ""
     elif not isinstance(generated_at, str):
         generated_at = str(generated_at)
+    return clean_text(generated_at) or generated_at
+
+
+def clean(data, workers=1, cache=None):
+    """
+    Clean full input data (dict with 'generated_at' and 'articles').
+    Same number of records; preserves structure. Output is UTF-8 safe.
+    workers > 1 cleans large inputs in a process pool with the same result;
+    cache is an optional CleanCache.
+    """
+    if not isinstance(data, dict):
+        return data
 
     articles = data.get("articles")
     if not isinstance(articles, list):
         articles = []
 
-    cleaned_articles = [clean_article(a) for a in articles]
+    cleaned_articles = list(iter_clean(articles, workers, cache))
 
     return {
-        "generated_at": clean_text(generated_at) or generated_at,
+        "generated_at": clean_generated_at(data.get("generated_at")),
         "articles": cleaned_articles,
     }
 
 
-def main():
-    input_path = "sample_data.json"
-    output_path = "cleaned_output.json"
+def clean_stream(input_file, output_file, workers=1, input_format="json", output_format="json",
+                 cache=None, compact=False):
+    """
+    Clean an input file into an output file one article at a time.
+    Memory is bounded by the largest single article (times the chunks in flight
+    when workers > 1). Formats are "json" or "jsonl"; compact selects compact JSON
+    output. Returns the number of articles.
+    """
+    generated_at, articles = read_articles(input_file, input_format)
+    return write_clean(generated_at, articles, output_file, workers, output_format, cache, compact)
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    cleaned = clean(data)
+def write_clean(generated_at, articles, output_file, workers=1, output_format="json", cache=None,
+                compact=False):
+    """
+    clean_stream for articles that are already being read, e.g. from dataio.open_articles.
+    Returns the number of articles.
+    """
+    writer = make_writer(output_file, output_format, clean_generated_at(generated_at),
+                         compact=compact)
+    for article in iter_clean(articles, workers, cache):
+        writer.write(article)
+    writer.close()
+    return writer.count
+
+
+def clean_mapped(mapped, output_file, workers=1, output_format="json", cache=None, compact=False):
+    """clean_stream reading from a MappedEnvelope. Returns the number of articles."""
+    writer = make_writer(output_file, output_format, clean_generated_at(mapped.generated_at),
+                         compact=compact)
+    for article in iter_clean_mapped(mapped, workers, cache):
+        writer.write(article)
+    writer.close()
+    return writer.count
+
+
+def add_mmap_argument(parser):
+    """Add the --mmap option shared by cleaner.py and pipeline.py."""
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="memory-map the JSON input and decode one article at a time (implies --stream)",
+    )
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(cleaned, f, indent=2, ensure_ascii=False)
 
-    print(f"Cleaned {len(cleaned['articles'])} articles -> {output_path}")
+def add_cache_arguments(parser):
+    """Add the --cache and --cache-size options shared by the command-line tools."""
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="SQLite file caching cleaned articles across runs (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f"maximum cached articles, least recently used evicted first (default: {DEFAULT_MAX_ENTRIES})",
+    )
+
+
+def open_cache(args):
+    """Return a CleanCache for parsed --cache/--cache-size options, or None."""
+    if not args.cache:
+        return None
+    return CleanCache(args.cache, cleaning_rules_version(), args.cache_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean scraped article data.")
+    parser.add_argument("input", nargs="?", default="sample_data.json")
+    parser.add_argument("output", nargs="?", default="cleaned_output.json")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="parse and write one article at a time instead of loading the whole file",
+    )
+    add_mmap_argument(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes used to clean large inputs (default: 1)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="file format for input and output (default: jsonl for .jsonl/.ndjson, else json)",
+    )
+    add_cache_arguments(parser)
+    jsoncodec.add_json_arguments(parser)
+    add_compression_argument(parser)
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="record per-stage timings and byte counts and write them to <output>.stats.json",
+    )
+    args = parser.parse_args(argv)
+    jsoncodec.set_backend(args.json_backend)
+    input_format = detect_format(args.input, args.format)
+    output_format = detect_format(args.output, args.format)
+    if args.mmap:
+        try:
+            check_mappable(args.input, input_format)
+        except ValueError as e:
+            parser.error(str(e))
+    cache = open_cache(args)
+    if args.stats:
+        instrument.enable()
+
+    try:
+        with instrument.stage("total"):
+            if args.mmap:
+                with MappedEnvelope(args.input) as mapped, \
+                        open_text(args.output, "w", args.compress_level) as fout:
+                    count = clean_mapped(mapped, fout, args.workers, output_format, cache, args.compact)
+            # JSON Lines is always written incrementally.
+            elif args.stream or "jsonl" in (input_format, output_format):
+                with open_articles(args.input, input_format) as (generated_at, articles), \
+                        open_text(args.output, "w", args.compress_level) as fout:
+                    count = write_clean(generated_at, articles, fout, args.workers, output_format, cache,
+                                        args.compact)
+            else:
+                with instrument.stage("json_load"), open_text(args.input) as f:
+                    data = load_data(f, input_format)
+
+                with instrument.stage("clean"):
+                    cleaned = clean(data, args.workers, cache)
+
+                with instrument.stage("json_dump"), open_text(args.output, "w", args.compress_level) as f:
+                    f.write(jsoncodec.dumps(cleaned, pretty=not args.compact, default=to_json))
+                count = len(cleaned["articles"])
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print(f"Cleaned {count} articles -> {args.output}")
+    if cache is not None:
+        print(cache.summary())
+    if args.stats:
+        instrument.count("articles", count)
+        instrument.count_file("bytes_in", args.input)
+        instrument.count_file("bytes_out", args.output)
+        instrument.disable()
+        stats_path = instrument.stats_path(args.output)
+        instrument.write_stats(stats_path)
+        print(f"Wrote stats -> {stats_path}")
 
 
 if __name__ == "__main__":
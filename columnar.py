@@ -0,0 +1,238 @@
+# Columnar Articles
+# Holds many articles as parallel columns plus one flags byte per record, so validation
+# counts are computed over whole columns instead of record by record. This is the form
+# validator.py keeps a whole file in while it validates it.
+
+from array import array
+from collections import Counter
+from itertools import compress
+
+from article import RECORD_TYPES, Article, field_text
+
+try:
+    import numpy as np
+except ImportError:  # optional; validate_batch falls back to pure Python
+    np = None
+
+
+# Bits of the per-record flags byte.
+TITLE_PRESENT = 1
+CONTENT_PRESENT = 2
+URL_PRESENT = 4
+DATE_PRESENT = 8
+URL_SCHEME_OK = 16
+CONTENT_LONG_ENOUGH = 32
+NOT_A_RECORD = 64
+
+MIN_CONTENT_LENGTH = 50
+
+_REQUIRED = TITLE_PRESENT | CONTENT_PRESENT | URL_PRESENT | URL_SCHEME_OK | CONTENT_LONG_ENOUGH
+
+
+def _errors_for(flags):
+    """validate_record's error codes for a record with the given flags byte."""
+    if flags & NOT_A_RECORD:
+        return ["invalid_record"]
+    errors = []
+    if not flags & TITLE_PRESENT:
+        errors.append("missing_title")
+    if not flags & CONTENT_PRESENT:
+        errors.append("missing_content")
+    if not flags & URL_PRESENT:
+        errors.append("missing_url")
+    if flags & URL_PRESENT and not flags & URL_SCHEME_OK:
+        errors.append("invalid_url")
+    if flags & CONTENT_PRESENT and not flags & CONTENT_LONG_ENOUGH:
+        errors.append("content_too_short")
+    return errors
+
+
+# Every possible flags byte maps to its validity (as a 0/1 byte) and error codes.
+_VALID_TABLE = bytes(1 if flags & NOT_A_RECORD == 0 and flags & _REQUIRED == _REQUIRED else 0
+                     for flags in range(256))
+_ERRORS_TABLE = [_errors_for(flags) for flags in range(256)]
+
+
+class ArticleBatch:
+    """
+    Articles as parallel url/title/content/published columns (the original values),
+    plus stripped title/content/url lengths and a flags byte per record computed once
+    when the record is added. Records that are not Articles (dicts with other keys, or
+    values that are not records at all) are also kept as they are, so article() gives
+    back exactly what was appended.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.titles = []
+        self.contents = []
+        self.published = []
+        self.title_lengths = array("I")
+        self.content_lengths = array("I")
+        self.url_lengths = array("I")
+        self.flags = bytearray()
+        self._originals = {}  # index -> appended value, for anything but an Article
+
+    @classmethod
+    def from_articles(cls, articles):
+        """Build a batch from an iterable of Articles (or article dicts)."""
+        batch = cls()
+        for article in articles:
+            batch.append(article)
+        return batch
+
+    def __len__(self):
+        return len(self.flags)
+
+    def append(self, article):
+        """Add one Article (or article dict). Anything else counts as an invalid record."""
+        if not isinstance(article, Article):
+            self._originals[len(self.flags)] = article
+        if not isinstance(article, RECORD_TYPES):
+            self.urls.append(None)
+            self.titles.append(None)
+            self.contents.append(None)
+            self.published.append(None)
+            self.title_lengths.append(0)
+            self.content_lengths.append(0)
+            self.url_lengths.append(0)
+            self.flags.append(NOT_A_RECORD)
+            return
+
+        url = article.get("url")
+        title = article.get("title")
+        content = article.get("content")
+        published = article.get("published")
+        self.urls.append(url)
+        self.titles.append(title)
+        self.contents.append(content)
+        self.published.append(published)
+
+        url_stripped = field_text(url)
+        title_length = len(field_text(title))
+        content_length = len(field_text(content))
+        self.title_lengths.append(title_length)
+        self.content_lengths.append(content_length)
+        self.url_lengths.append(len(url_stripped))
+
+        flags = 0
+        if title_length:
+            flags |= TITLE_PRESENT
+        if content_length:
+            flags |= CONTENT_PRESENT
+        if content_length >= MIN_CONTENT_LENGTH:
+            flags |= CONTENT_LONG_ENOUGH
+        if url_stripped:
+            flags |= URL_PRESENT
+        if url_stripped.startswith(("http://", "https://")):
+            flags |= URL_SCHEME_OK
+        if field_text(published):
+            flags |= DATE_PRESENT
+        self.flags.append(flags)
+
+    def article(self, index):
+        """The record at index: an Article, or the value that was appended if it was not one."""
+        if index in self._originals:
+            return self._originals[index]
+        return Article(self.urls[index], self.titles[index], self.contents[index], self.published[index])
+
+    def valid_mask(self):
+        """One byte per record: 1 if it passes validate_record, else 0."""
+        return self.flags.translate(_VALID_TABLE)
+
+    def select(self, mask):
+        """Yield the records whose mask byte is non-zero, in order."""
+        for i in compress(range(len(self)), mask):
+            yield self.article(i)
+
+
+class _Counts:
+    """The counters validate_batch fills in (see validator.ValidationStats)."""
+
+    def __init__(self, total):
+        self.total = total
+        self.valid_count = 0
+        self.invalid_count = 0
+        self.title_present_count = 0
+        self.content_present_count = 0
+        self.url_present_count = 0
+        self.date_present_count = 0
+        self.error_counts = Counter()
+
+    def counters(self):
+        counters = dict(vars(self))
+        counters["error_counts"] = dict(self.error_counts)
+        return counters
+
+
+def validate_batch(batch, use_numpy=None):
+    """
+    Validate a whole ArticleBatch. Returns (counters, valid_mask) where counters are the
+    raw counts in validator.ValidationStats.counters() form and valid_mask has one 0/1
+    byte per record. Uses NumPy when it is installed (use_numpy=None) or when use_numpy
+    is true; both paths give identical results.
+    """
+    if use_numpy or (use_numpy is None and np is not None):
+        return _validate_batch_numpy(batch)
+
+    stats = _Counts(len(batch))
+    # Every count below depends only on the flags byte, so count each distinct byte once.
+    for flags, count in Counter(batch.flags).items():
+        if flags & NOT_A_RECORD:
+            stats.invalid_count += count
+            stats.error_counts["invalid_record"] += count
+            continue
+        if flags & TITLE_PRESENT:
+            stats.title_present_count += count
+        if flags & CONTENT_PRESENT:
+            stats.content_present_count += count
+        if flags & URL_PRESENT:
+            stats.url_present_count += count
+        if flags & DATE_PRESENT:
+            stats.date_present_count += count
+        if _VALID_TABLE[flags]:
+            stats.valid_count += count
+        else:
+            stats.invalid_count += count
+            for error in _ERRORS_TABLE[flags]:
+                stats.error_counts[error] += count
+    return stats.counters(), batch.valid_mask()
+
+
+def _validate_batch_numpy(batch):
+    """validate_batch with one boolean mask per validate_record rule."""
+    if np is None:
+        raise ImportError("NumPy is not installed")
+    flags = np.frombuffer(batch.flags, dtype=np.uint8)
+    title_lengths = np.frombuffer(batch.title_lengths, dtype=np.uint32)
+    content_lengths = np.frombuffer(batch.content_lengths, dtype=np.uint32)
+    url_lengths = np.frombuffer(batch.url_lengths, dtype=np.uint32)
+
+    not_record = (flags & NOT_A_RECORD) != 0
+    record = ~not_record
+    error_masks = {
+        "missing_title": record & (title_lengths == 0),
+        "missing_content": record & (content_lengths == 0),
+        "missing_url": record & (url_lengths == 0),
+        "invalid_url": record & (url_lengths > 0) & ((flags & URL_SCHEME_OK) == 0),
+        "content_too_short": record & (content_lengths > 0) & (content_lengths < MIN_CONTENT_LENGTH),
+        "invalid_record": not_record,
+    }
+    invalid = np.zeros(len(flags), dtype=bool)
+    for mask in error_masks.values():
+        invalid |= mask
+    valid = ~invalid
+
+    stats = _Counts(len(flags))
+    stats.valid_count = int(np.count_nonzero(valid))
+    stats.invalid_count = stats.total - stats.valid_count
+    stats.title_present_count = int(np.count_nonzero(record & (title_lengths > 0)))
+    stats.content_present_count = int(np.count_nonzero(record & (content_lengths > 0)))
+    stats.url_present_count = int(np.count_nonzero(record & (url_lengths > 0)))
+    stats.date_present_count = int(np.count_nonzero(record & ((flags & DATE_PRESENT) != 0)))
+    for error, mask in error_masks.items():
+        count = int(np.count_nonzero(mask))
+        if count:
+            stats.error_counts[error] = count
+    return stats.counters(), valid.astype(np.uint8).tobytes()
+
@@ -0,0 +1,549 @@
+# Data I/O
+# Readers and writers for article files: the {"generated_at": ..., "articles": [...]}
+# JSON document and JSON Lines (one article object per line), optionally compressed.
+
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+from contextlib import contextmanager
+
+import jsoncodec
+from article import Article, from_json
+from mmapio import MappedEnvelope
+
+
+# Characters read from the input per refill; grows while a single value is being decoded.
+READ_CHUNK_SIZE = 1 << 16
+
+# File extensions read and written as JSON Lines unless a format is given explicitly.
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+FORMATS = ("json", "jsonl")
+
+# Compressed files are recognized by their last extension, e.g. articles.jsonl.gz.
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+# Output files are written through buffers of this many bytes.
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Used when no --compress-level is given (gzip.open's own default, 9, is much slower for little gain).
+DEFAULT_COMPRESSION_LEVELS = {"gzip": 6, "bz2": 9, "xz": 6, "zstd": 3}
+
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a JSON number (e.g. "1769." at the end of a chunk).
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+try:
+    import zstandard
+except ImportError:  # optional; only needed for .zst files
+    zstandard = None
+_decoder = json.JSONDecoder()
+
+
+class _TextBuffer:
+    """Sliding window over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, f, chunk_size=READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        """Read up to size more characters, dropping what was already consumed."""
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char):
+        """Consume char (after optional whitespace) or raise ValueError."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON input, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def _may_continue(self, value, end):
+        """True if value (decoded up to end) is a number that more input could still extend."""
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return False
+        buf = self.buf
+        while end < len(buf):
+            if buf[end] not in _NUMBER_CHARS:
+                return False
+            end += 1
+        return True
+
+    def decode(self):
+        """Decode and consume the next JSON value."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+            else:
+                # A number followed only by number characters up to the end of the buffer
+                # may have been cut off by the chunk boundary ("1769." or "1e-" decodes as an int).
+                if not self._may_continue(value, end) or not self._fill(size):
+                    self.pos = end
+                    return value
+            # Read more on each retry so very large values are decoded in linear time.
+            size = max(size, len(self.buf))
+
+
+def read_envelope(f, chunk_size=READ_CHUNK_SIZE, late_generated_at=False):
+    """
+    Incrementally parse {"generated_at": ..., "articles": [...]} from text file f.
+    Returns (generated_at, articles) where articles is an iterator decoding one
+    Article at a time (array elements that are not objects are passed through).
+    generated_at is None if it does not appear before "articles"; it may not appear
+    after it, because the value is needed before any article, unless late_generated_at
+    is true (the caller has found it some other way and it is skipped).
+    """
+    reader = _TextBuffer(f, chunk_size)
+    reader.expect("{")
+    generated_at = None
+
+    # Read keys up to "articles"; anything else before it is decoded and skipped.
+    found_articles = False
+    if reader.peek() != "}":
+        while True:
+            key = reader.decode()
+            reader.expect(":")
+            if key == "articles":
+                found_articles = True
+                break
+            value = reader.decode()
+            if key == "generated_at":
+                generated_at = value
+            if reader.peek() != ",":
+                break
+            reader.expect(",")
+
+    return generated_at, _iter_articles(reader, found_articles, late_generated_at)
+
+
+def _iter_articles(reader, found_articles, late_generated_at=False):
+    """Yield each element of the "articles" array, then check the rest of the object."""
+    if found_articles:
+        if reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() != "]":
+                while True:
+                    yield from_json(reader.decode())
+                    if reader.peek() != ",":
+                        break
+                    reader.expect(",")
+            reader.expect("]")
+        else:
+            # "articles" is not a list: treated as no articles, like cleaner.clean.
+            reader.decode()
+
+        while reader.peek() == ",":
+            reader.expect(",")
+            key = reader.decode()
+            reader.expect(":")
+            reader.decode()
+            if key == "generated_at" and not late_generated_at:
+                raise ValueError('"generated_at" must come before "articles" when streaming')
+    reader.expect("}")
+
+
+class EnvelopeWriter:
+    """
+    Write {"generated_at": ..., "articles": [...]} to text file f one article at a time.
+    Output is identical to json.dump(..., indent=2, ensure_ascii=False) of the full dict,
+    or to jsoncodec.dumps(...) of it with compact=True.
+    """
+
+    def __init__(self, f, generated_at, count=None, compact=False):
+        self.f = f
+        self.compact = compact
+        if count is not None:
+            # Resuming output cut off after count articles: the header is already written.
+            self.count = count
+            return
+        self.count = 0
+        if compact:
+            f.write('{"generated_at":')
+            f.write(jsoncodec.dumps(generated_at))
+            f.write(',"articles":[')
+        else:
+            f.write('{\n  "generated_at": ')
+            f.write(json.dumps(generated_at, ensure_ascii=False))
+            f.write(',\n  "articles": [')
+
+    def write(self, article):
+        """Append one article (an Article or any JSON value) to the array."""
+        if isinstance(article, Article):
+            article = article.to_dict()
+        if self.compact:
+            if self.count:
+                self.f.write(",")
+            self.f.write(jsoncodec.dumps(article))
+        else:
+            text = jsoncodec.dumps(article, pretty=True)
+            self.f.write("\n    " if self.count == 0 else ",\n    ")
+            # Nested two levels deep; JSON strings never contain raw newlines.
+            self.f.write(text.replace("\n", "\n    "))
+        self.count += 1
+
+    def close(self):
+        """Close the array and the object. Does not close f."""
+        if self.compact:
+            self.f.write("]}")
+        else:
+            self.f.write("\n  ]\n}" if self.count else "]\n}")
+
+
+class JsonlWriter:
+    """
+    Write one article per line to text file f. generated_at has no place in JSON Lines.
+    Lines look like json.dumps(article, ensure_ascii=False), or have no spaces with compact=True.
+    """
+
+    def __init__(self, f, count=0, compact=False):
+        self.f = f
+        self.count = count
+        self.compact = compact
+
+    def write(self, article):
+        """Append one article (an Article or any JSON value) as a single line."""
+        if isinstance(article, Article):
+            article = article.to_dict()
+        if self.compact:
+            self.f.write(jsoncodec.dumps(article))
+        else:
+            self.f.write(json.dumps(article, ensure_ascii=False))
+        self.f.write("\n")
+        self.count += 1
+
+    def close(self):
+        """Nothing to terminate; kept so both writers share an interface. Does not close f."""
+
+
+def split_compression(path):
+    """(path without its compression extension, compression name or None): a.jsonl.gz -> (a.jsonl, gzip)."""
+    root, ext = os.path.splitext(path)
+    compression = COMPRESSION_EXTENSIONS.get(ext.lower())
+    if compression is None:
+        return path, None
+    return root, compression
+
+
+def open_text(path, mode="r", level=None):
+    """
+    Open path as UTF-8 text for reading ("r") or writing ("w"), compressing or decompressing
+    on the fly when its extension is .gz, .bz2, .xz or .zst. level is the compression level
+    (default DEFAULT_COMPRESSION_LEVELS); it is ignored for reading and uncompressed files.
+    Files opened for writing are AtomicTextFiles (see AtomicFile for binary data).
+    """
+    if mode == "w":
+        return AtomicTextFile(path, level)
+    if mode != "r":
+        raise ValueError(f"Unsupported mode {mode!r}; expected 'r' or 'w'")
+    compression = split_compression(path)[1]
+    if compression is None:
+        return open(path, "r", encoding="utf-8")
+    if compression == "gzip":
+        raw = gzip.GzipFile(path, "rb")
+    elif compression == "bz2":
+        raw = bz2.BZ2File(path, "rb")
+    elif compression == "xz":
+        raw = lzma.LZMAFile(path, "rb")
+    else:
+        _require_zstandard(path)
+        return zstandard.open(path, "rt", encoding="utf-8")
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def _require_zstandard(path):
+    if zstandard is None:
+        raise ValueError(f"Reading or writing {path} needs the zstandard package (pip install zstandard)")
+
+
+def _compressor(raw, compression, level, name):
+    """Binary file object compressing into raw (which it does not close), or raw itself."""
+    if compression is None:
+        return raw
+    if level is None:
+        level = DEFAULT_COMPRESSION_LEVELS[compression]
+    if compression == "gzip":
+        # mtime=0 keeps the output identical from run to run.
+        return gzip.GzipFile(name, "wb", compresslevel=level, fileobj=raw, mtime=0)
+    if compression == "bz2":
+        return bz2.BZ2File(raw, "wb", compresslevel=level)
+    if compression == "xz":
+        return lzma.LZMAFile(raw, "wb", preset=level)
+    return zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=False)
+
+
+def _fsync_directory(directory):
+    """Make a rename in directory durable (not possible, and not needed, on Windows)."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicFile(io.BufferedIOBase):
+    """
+    Binary file that appears at path only once it is completely written. Bytes go to a
+    temporary file next to path through a WRITE_BUFFER_SIZE buffer (compressed according
+    to path's extension); close() fsyncs it and renames it over path. If the with-block
+    raises, the temporary file is deleted and path is left as it was; if the process dies,
+    path is likewise untouched (a stray .tmp file may remain).
+    """
+
+    def __init__(self, path, level=None):
+        directory, name = os.path.split(path)
+        compression = split_compression(path)[1]
+        if compression == "zstd":
+            _require_zstandard(path)
+        self.path = path
+        self._tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        self._raw = open(self._tmp_path, "wb", buffering=WRITE_BUFFER_SIZE)
+        try:
+            self._stream = _compressor(self._raw, compression, level, name)
+        except BaseException:
+            self._raw.close()
+            os.remove(self._tmp_path)
+            raise
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self._stream.write(data)
+
+    def flush(self):
+        if not self._raw.closed:
+            self._stream.flush()
+
+    def fileno(self):
+        return self._raw.fileno()
+
+    def close(self):
+        """Finish writing and move the file into place. Does nothing if already closed."""
+        if self.closed:
+            return
+        try:
+            if self._stream is not self._raw:
+                self._stream.close()  # writes the end of the compressed stream into _raw
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+        except BaseException:
+            self.discard()
+            raise
+        self._raw.close()
+        super().close()
+        if os.path.exists(self.path):
+            os.chmod(self._tmp_path, os.stat(self.path).st_mode)
+        os.replace(self._tmp_path, self.path)
+        _fsync_directory(os.path.dirname(self.path))
+
+    def discard(self):
+        """Close without touching path and delete what was written."""
+        self._raw.close()
+        super().close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __del__(self):
+        # An unclosed file (e.g. after an exception outside a with-block) is never moved into place.
+        if getattr(self, "_stream", None) is not None and not self.closed:
+            self.discard()
+
+
+class AtomicTextFile(io.TextIOWrapper):
+    """UTF-8 text written through an AtomicFile: path only appears once it is completely written."""
+
+    def __init__(self, path, level=None):
+        self.path = path
+        super().__init__(AtomicFile(path, level), encoding="utf-8")
+
+    def close(self):
+        """Finish writing and move the file into place. Does nothing if already closed."""
+        if self.closed:
+            return
+        try:
+            self.flush()
+        except BaseException:
+            self.discard()
+            raise
+        super().close()
+
+    def discard(self):
+        """Close without touching path and delete what was written."""
+        self.buffer.discard()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __del__(self):
+        try:
+            closed = self.closed
+        except ValueError:
+            return  # __init__ failed before the file was set up
+        if not closed:
+            self.discard()
+
+
+def detect_format(path, fmt=None):
+    """
+    Return fmt if given, else "jsonl" for JSONL_EXTENSIONS and "json" for anything else.
+    A compression extension is ignored: a.jsonl.gz is JSON Lines.
+    """
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+        return fmt
+    ext = os.path.splitext(split_compression(path)[0])[1].lower()
+    return "jsonl" if ext in JSONL_EXTENSIONS else "json"
+
+
+def read_jsonl(f):
+    """Yield one Article (or other JSON value) per non-blank line of text file f."""
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield from_json(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from None
+
+
+def read_articles(f, fmt):
+    """
+    Return (generated_at, articles iterator) for text file f in the given format.
+    JSON Lines has no generated_at, so it is None there.
+    """
+    if fmt == "jsonl":
+        return None, read_jsonl(f)
+    return read_envelope(f)
+
+
+@contextmanager
+def open_articles(path, fmt):
+    """
+    Yield (generated_at, articles iterator) for the file at path, like read_articles, but
+    also accept a JSON document whose "generated_at" comes after "articles". In that case,
+    an uncompressed file is scanned for it with mmapio, and a compressed one is streamed
+    through a second time (see find_generated_at), so memory stays bounded either way.
+    """
+    if fmt == "jsonl":
+        with open_text(path) as f:
+            yield None, read_jsonl(f)
+        return
+
+    with open_text(path) as f:
+        generated_at, articles = read_envelope(f, late_generated_at=True)
+        if generated_at is None:
+            if split_compression(path)[1]:
+                with open_text(path) as g:
+                    generated_at = find_generated_at(g)
+            else:
+                with MappedEnvelope(path) as mapped:
+                    generated_at = mapped.generated_at
+        yield generated_at, articles
+
+
+def find_generated_at(f, chunk_size=READ_CHUNK_SIZE):
+    """
+    The top-level "generated_at" of the JSON object in text file f, or None if it has none,
+    wherever it appears. Other values are decoded and discarded one at a time (one article
+    at a time for an array), so the whole file is never held in memory.
+    """
+    reader = _TextBuffer(f, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return None
+    while True:
+        key = reader.decode()
+        reader.expect(":")
+        if key == "generated_at":
+            return reader.decode()
+        if reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() != "]":
+                while True:
+                    reader.decode()
+                    if reader.peek() != ",":
+                        break
+                    reader.expect(",")
+            reader.expect("]")
+        else:
+            reader.decode()
+        if reader.peek() != ",":
+            return None
+        reader.expect(",")
+
+
+def load_data(f, fmt):
+    """
+    Load a whole file as a {"generated_at", "articles"} dict (JSON Lines has only articles).
+    Article objects in the list go through article.from_json.
+    """
+    if fmt == "jsonl":
+        return {"articles": list(read_jsonl(f))}
+    data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("articles"), list):
+        data["articles"] = [from_json(a) for a in data["articles"]]
+    return data
+
+
+def make_writer(f, fmt, generated_at, count=None, compact=False):
+    """
+    Return an EnvelopeWriter or JsonlWriter on text file f. With count, f already holds
+    the first count articles of an unfinished output (e.g. from a checkpoint) and the
+    writer continues after them. compact selects the writers' compact output.
+    """
+    if fmt == "jsonl":
+        return JsonlWriter(f, count or 0, compact)
+    return EnvelopeWriter(f, generated_at, count, compact)
+
+
+def add_compression_argument(parser):
+    """Add the --compress-level option shared by the command-line tools."""
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        metavar="N",
+        help="compression level for .gz/.bz2/.xz/.zst outputs; higher is smaller but slower "
+             f"(defaults: {', '.join(f'{k} {v}' for k, v in DEFAULT_COMPRESSION_LEVELS.items())})",
+    )
@@ -0,0 +1,122 @@
+# URL Deduplication
+# Detects articles whose URL was already seen, after normalizing away differences that do not
+# change the page (scheme, host case, default port, trailing slash, tracking parameters).
+# Seen URLs are kept as 64-bit fingerprints in an open-addressing table, not as strings.
+
+import hashlib
+from array import array
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that only track where a click came from; any utm_* parameter is also dropped.
+TRACKING_PARAMS = frozenset((
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid",
+    "ref", "ref_src", "smid", "smtyp", "cmpid", "partner", "ocid",
+))
+
+# The table doubles when it is more than this full (lower is faster, higher is smaller).
+MAX_LOAD_FACTOR = 0.7
+
+
+def normalize_url(url):
+    """
+    Canonical form of url used for duplicate detection: http/https and host case ignored,
+    default ports, fragments, tracking parameters and trailing slashes removed, and the
+    remaining query parameters sorted. Returns "" for empty or non-string input.
+    """
+    if not isinstance(url, str):
+        return ""
+    url = url.strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme in ("http", "https"):
+        scheme = "https"
+    host = (parts.hostname or "").rstrip(".")
+    if port is not None and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/")
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+def url_fingerprint(url):
+    """Non-zero 64-bit hash of normalize_url(url) (0 marks an empty table slot)."""
+    return _fingerprint(normalize_url(url))
+
+
+def _fingerprint(normalized):
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class UrlDeduper:
+    """
+    Set of seen URLs stored as 64-bit fingerprints in a linear-probing hash table
+    (8 bytes per slot, 11-23 bytes per URL depending on how full the table is).
+    Two different URLs collide with probability about n^2 / 2^65, i.e. ~3e-4 at 100M URLs.
+    """
+
+    def __init__(self, initial_capacity=1 << 16):
+        capacity = 1
+        while capacity < initial_capacity:
+            capacity *= 2
+        self._table = array("Q", bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._count = 0
+        self.duplicates = 0
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self):
+        """Size of the fingerprint table in bytes."""
+        return self._table.itemsize * len(self._table)
+
+    def _insert(self, fingerprint):
+        """Add fingerprint; returns False if it was already present."""
+        table = self._table
+        mask = self._mask
+        slot = fingerprint & mask
+        while True:
+            current = table[slot]
+            if current == 0:
+                table[slot] = fingerprint
+                self._count += 1
+                if self._count > MAX_LOAD_FACTOR * len(table):
+                    self._grow()
+                return True
+            if current == fingerprint:
+                return False
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        old = self._table
+        self._table = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        self._count = 0
+        for fingerprint in old:
+            if fingerprint:
+                self._insert(fingerprint)
+
+    def add(self, url):
+        """
+        Record url. Returns True the first time a normalized URL is seen and False for
+        a duplicate. Empty URLs are never treated as duplicates.
+        """
+        normalized = normalize_url(url)
+        if not normalized:
+            return True
+        if self._insert(_fingerprint(normalized)):
+            return True
+        self.duplicates += 1
+        return False
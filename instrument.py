@@ -0,0 +1,210 @@
+# Instrumentation
+# Opt-in wall time, call counts and byte counters for the pipeline's stages and hot functions.
+# enable() swaps timed wrappers into the cleaner, validator and dataio modules and disable()
+# puts the originals back, so nothing is measured (and nothing costs extra) while disabled.
+# Times are inclusive: clean_article includes its clean_text calls, which include the
+# clean_text.* steps. Work done in worker processes (--workers > 1) is not recorded.
+
+import functools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from dataio import open_text
+
+
+_enabled = False
+_timings = {}            # stage name -> [calls, seconds]
+_counters = Counter()    # e.g. bytes_in, bytes_out, articles
+_originals = []          # (owner, attribute, original value) restored by disable()
+
+
+class _TimedPattern:
+    """Stands in for a compiled regex, timing its sub() calls."""
+
+    def __init__(self, pattern, name):
+        self._pattern = pattern
+        self._name = name
+
+    def sub(self, repl, string, count=0):
+        start = time.perf_counter()
+        try:
+            return self._pattern.sub(repl, string, count)
+        finally:
+            _add_time(self._name, time.perf_counter() - start)
+
+    def __getattr__(self, attr):
+        return getattr(self._pattern, attr)
+
+
+class _TimedHtml:
+    """Stands in for the html module inside cleaner, timing html.unescape."""
+
+    def __init__(self, module):
+        self._module = module
+        self.unescape = _timed(module.unescape, "clean_text.unescape")
+
+    def __getattr__(self, attr):
+        return getattr(self._module, attr)
+
+
+def _add_time(name, seconds):
+    entry = _timings.get(name)
+    if entry is None:
+        _timings[name] = [1, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _timed(func, name):
+    """Wrap func so each call adds its wall time to stage name."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _add_time(name, time.perf_counter() - start)
+    return wrapper
+
+
+def _timed_iterator(func, name):
+    """Wrap a generator function so the time spent producing each item counts as one call."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        iterator = iter(func(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _add_time(name, time.perf_counter() - start)
+            yield item
+    return wrapper
+
+
+def _with_main(module):
+    """module, plus __main__ when the same file is running as a script (python3 cleaner.py)."""
+    main = sys.modules.get("__main__")
+    main_file = getattr(main, "__file__", None)
+    if main is not module and main_file and os.path.exists(main_file) and \
+            os.path.samefile(main_file, module.__file__):
+        return [module, main]
+    return [module]
+
+
+def _targets():
+    """(owner, attribute, replacement) for everything enable() instruments."""
+    import cleaner
+    import dataio
+    import validator
+
+    targets = []
+    for module in _with_main(cleaner):
+        targets += [
+            (module, "clean_text", _timed(module.clean_text, "clean_text")),
+            (module, "clean_article", _timed(module.clean_article, "clean_article")),
+            (module, "parse_date_to_iso", _timed(module.parse_date_to_iso, "parse_date_to_iso")),
+            (module.DateParser, "parse", _timed(module.DateParser.parse, "parse_date_to_iso")),
+            (module, "html", _TimedHtml(module.html)),
+            (module, "_TAG_RE", _TimedPattern(module._TAG_RE, "clean_text.strip_tags")),
+            (module, "_WHITESPACE_RE", _TimedPattern(module._WHITESPACE_RE, "clean_text.whitespace")),
+            (module, "_CONTROL_RE", _TimedPattern(module._CONTROL_RE, "clean_text.control_chars")),
+        ]
+    for module in _with_main(validator):
+        targets.append((module, "validate_record", _timed(module.validate_record, "validate_record")))
+    targets += [
+        (dataio._TextBuffer, "decode", _timed(dataio._TextBuffer.decode, "json_parse")),
+        (dataio, "read_jsonl", _timed_iterator(dataio.read_jsonl, "json_parse")),
+        (dataio.EnvelopeWriter, "write", _timed(dataio.EnvelopeWriter.write, "json_write")),
+        (dataio.JsonlWriter, "write", _timed(dataio.JsonlWriter.write, "json_write")),
+    ]
+    return targets
+
+
+def enable():
+    """Start recording. Clears previous measurements."""
+    global _enabled
+    if _enabled:
+        return
+    reset()
+    for owner, attribute, replacement in _targets():
+        _originals.append((owner, attribute, getattr(owner, attribute)))
+        setattr(owner, attribute, replacement)
+    _enabled = True
+
+
+def disable():
+    """Stop recording and restore the uninstrumented functions. Measurements are kept."""
+    global _enabled
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+    _enabled = False
+
+
+def is_enabled():
+    """True between enable() and disable()."""
+    return _enabled
+
+
+def reset():
+    """Forget all measurements."""
+    _timings.clear()
+    _counters.clear()
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one call of stage name (does nothing while disabled)."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add_time(name, time.perf_counter() - start)
+
+
+def count(name, amount=1):
+    """Add amount to counter name (does nothing while disabled)."""
+    if _enabled:
+        _counters[name] += amount
+
+
+def count_file(name, path):
+    """Add the size of the file at path to counter name, e.g. bytes_in or bytes_out."""
+    if _enabled and os.path.exists(path):
+        _counters[name] += os.path.getsize(path)
+
+
+def snapshot():
+    """Measurements so far as a JSON-serializable dict."""
+    return {
+        "stages": {
+            name: {"calls": calls, "seconds": round(seconds, 6)}
+            for name, (calls, seconds) in sorted(_timings.items())
+        },
+        "counters": dict(sorted(_counters.items())),
+    }
+
+
+def stats_path(path):
+    """Where the stats block for an output or report file goes: quality_report.txt -> quality_report.stats.json."""
+    root, ext = os.path.splitext(path)
+    return (root if ext else path) + ".stats.json"
+
+
+def write_stats(path):
+    """Write snapshot() as JSON to path."""
+    with open_text(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+        f.write("\n")
+
@@ -0,0 +1,137 @@
+# JSON Codec
+# Whole-value JSON encoding through the fastest installed library: orjson, then ujson, then the
+# standard json module. Output is the same whichever library is used: the others write floats their
+# own way (1e16 rather than 1e+16, null for NaN), so any value holding a float is encoded by json.
+# Decoding stays with json: on article text (long strings, much of it non-ASCII) its decoder
+# measured faster than orjson's (python3 -m benchmarks.bench_json).
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional
+    ujson = None
+
+
+BACKENDS = ("orjson", "ujson", "json")
+
+_name = None
+_dumps_compact = None
+_dumps_pretty = None
+
+
+def _json_dumps_compact(obj, default):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def _json_dumps_pretty(obj, default):
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+
+
+def _has_float(value, default):
+    """True if value holds a float anywhere (looking through default for other objects)."""
+    if isinstance(value, float):
+        return True
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        if default is None or isinstance(value, (str, int)) or value is None:
+            return False
+        try:
+            return _has_float(default(value), default)
+        except TypeError:
+            return False  # the encoder reports it
+    # Article text is almost all strings, so skip those without a call.
+    return any(type(v) is not str and _has_float(v, default) for v in value)
+
+
+def _orjson_dumper(option, fallback):
+    def dumps(obj, default):
+        # orjson writes NaN and infinities as null and exponents differently (1e16, 0.00001).
+        if _has_float(obj, default):
+            return fallback(obj, default)
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits or lone surrogates: let json encode (or reject) them.
+            return fallback(obj, default)
+    return dumps
+
+
+def _ujson_dumps_compact(obj, default):
+    if _has_float(obj, default):
+        return _json_dumps_compact(obj, default)
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=default)
+    except (OverflowError, TypeError, ValueError):
+        return _json_dumps_compact(obj, default)
+
+
+def available_backends():
+    """Names of the backends that can be used here, fastest first."""
+    return [
+        name for name, module in zip(BACKENDS, (orjson, ujson, json)) if module is not None
+    ]
+
+
+def set_backend(name=None):
+    """
+    Use backend name ("orjson", "ujson" or "json"), or the fastest installed one if name is
+    None or "auto". Raises ValueError if the backend is not installed.
+    """
+    global _name, _dumps_compact, _dumps_pretty
+    if name in (None, "auto"):
+        name = available_backends()[0]
+    if name not in available_backends():
+        raise ValueError(f"JSON backend {name!r} is not installed; available: {available_backends()}")
+
+    if name == "orjson":
+        _dumps_compact = _orjson_dumper(orjson.OPT_NON_STR_KEYS, _json_dumps_compact)
+        _dumps_pretty = _orjson_dumper(orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2, _json_dumps_pretty)
+    elif name == "ujson":
+        # ujson's indented layout differs from json's, so pretty output stays with json.
+        _dumps_compact = _ujson_dumps_compact
+        _dumps_pretty = _json_dumps_pretty
+    else:
+        _dumps_compact = _json_dumps_compact
+        _dumps_pretty = _json_dumps_pretty
+    _name = name
+
+
+def backend():
+    """Name of the backend in use."""
+    return _name
+
+
+def dumps(obj, pretty=False, default=None):
+    """
+    Encode obj as a str with non-ASCII characters kept as-is. pretty gives the same text as
+    json.dumps(obj, indent=2, ensure_ascii=False); otherwise the output is compact, with no
+    whitespace at all. default is called for objects JSON cannot encode, as in json.dumps.
+    """
+    if pretty:
+        return _dumps_pretty(obj, default)
+    return _dumps_compact(obj, default)
+
+
+def add_json_arguments(parser):
+    """Add the --compact and --json-backend options shared by the command-line tools."""
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="write JSON without indentation or spaces (smaller and faster than the pretty default)",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=("auto",) + BACKENDS,
+        default="auto",
+        help="library used to encode JSON output (default: fastest installed)",
+    )
+
+
+set_backend()
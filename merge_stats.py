@@ -0,0 +1,34 @@
+# Merge Validation Stats
+# Combines partial validation counters written with --partial by validator.py or pipeline.py
+# (one file per shard or machine) into a single quality_report.txt.
+
+import argparse
+
+from validator import merge_stats, read_partial, write_partial, write_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge partial validation stats into one quality report.")
+    parser.add_argument("partials", nargs="+", metavar="PARTIAL", help="files written with --partial")
+    parser.add_argument(
+        "--report",
+        default="quality_report.txt",
+        help="where to write the merged report (default: quality_report.txt)",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="PATH",
+        help="also save the merged counters to PATH, to merge again later",
+    )
+    args = parser.parse_args(argv)
+
+    stats = merge_stats(read_partial(path) for path in args.partials)
+    write_report(stats.result(), args.report)
+    print(f"Merged {len(args.partials)} partial stats ({stats.total} records) into {args.report}")
+    if args.output:
+        write_partial(stats, args.output)
+        print(f"Saved merged stats to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# Near-Duplicate Detection
+# Finds articles whose cleaned content is nearly identical (e.g. syndicated stories under
+# different URLs) using word shingles, MinHash signatures and an LSH banding index, so each
+# new article is compared only with the few earlier articles that share a band.
+
+import re
+import zlib
+from collections import OrderedDict
+from random import Random
+
+try:
+    import numpy as np
+except ImportError:  # optional; signatures are computed in pure Python without it
+    np = None
+
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 5
+# Articles kept in the index; the oldest are forgotten beyond this, bounding memory.
+DEFAULT_MAX_DOCS = 200_000
+# Largest clusters listed in the quality report.
+REPORT_TOP_CLUSTERS = 5
+
+_WORD_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+
+
+def shingles(text, size=DEFAULT_SHINGLE_SIZE):
+    """Set of 32-bit hashes of the lowercase word size-grams of text (one shingle if shorter)."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def choose_bands(num_perm, threshold):
+    """
+    (bands, rows) with bands * rows == num_perm whose LSH threshold (1/bands)^(1/rows)
+    is closest to threshold.
+    """
+    candidates = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(candidates, key=lambda br: abs((1.0 / br[0]) ** (1.0 / br[1]) - threshold))
+
+
+class NearDuplicateDetector:
+    """
+    Streaming near-duplicate detector over article content.
+
+    add() returns the label of an earlier article whose estimated Jaccard similarity
+    (over word shingles) is at least threshold, or None. Articles that match are counted
+    in that article's cluster; others are indexed. At most max_docs articles are indexed,
+    the oldest being dropped first, so memory stays bounded on any input size. A dropped
+    article's cluster can no longer grow, so only the largest REPORT_TOP_CLUSTERS of
+    those are remembered.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                 shingle_size=DEFAULT_SHINGLE_SIZE, max_docs=DEFAULT_MAX_DOCS, seed=1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_docs = max_docs
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+        # Multiply-shift hash family: h(x) = ((a * x + b) mod 2^64) >> 32, with odd a.
+        rng = Random(seed)
+        self._a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self._b = [rng.getrandbits(64) for _ in range(num_perm)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+
+        self._buckets = [dict() for _ in range(self.bands)]   # band key -> doc id
+        self._docs = OrderedDict()                             # doc id -> (label, signature)
+        self._next_id = 0
+        self._cluster_sizes = {}                               # indexed doc id -> cluster size
+        self._closed_clusters = []                             # largest [label, size] of dropped docs
+        self.cluster_count = 0
+        self.duplicates = 0
+
+    def signature(self, text):
+        """MinHash signature of text as a tuple of num_perm ints (None if text has no words)."""
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            return None
+        if np is not None:
+            x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+            return tuple(((self._a_np * x + self._b_np) >> np.uint64(32)).min(axis=1).tolist())
+        return tuple(
+            min(((a * x + b) & _MASK64) >> 32 for x in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [hash(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def add(self, label, text):
+        """
+        Check text against earlier articles and index it. Returns the label of the
+        earlier article it duplicates, or None.
+        """
+        if not isinstance(text, str):
+            return None
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+
+        checked = set()
+        for band, key in enumerate(keys):
+            doc_id = self._buckets[band].get(key)
+            if doc_id is None or doc_id in checked:
+                continue
+            checked.add(doc_id)
+            other_label, other_signature = self._docs[doc_id]
+            same = sum(1 for x, y in zip(signature, other_signature) if x == y)
+            if same >= self.threshold * self.num_perm:
+                self.duplicates += 1
+                if doc_id not in self._cluster_sizes:
+                    self.cluster_count += 1
+                self._cluster_sizes[doc_id] = self._cluster_sizes.get(doc_id, 1) + 1
+                return other_label
+
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = (label, signature)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, doc_id)
+        if len(self._docs) > self.max_docs:
+            self._forget_oldest()
+        return None
+
+    def _forget_oldest(self):
+        doc_id, (label, signature) = self._docs.popitem(last=False)
+        for band, key in enumerate(self._band_keys(signature)):
+            if self._buckets[band].get(key) == doc_id:
+                del self._buckets[band][key]
+        size = self._cluster_sizes.pop(doc_id, None)
+        if size is not None:
+            self._closed_clusters = _largest(self._closed_clusters + [[label, size]])
+
+    def summary(self, top=REPORT_TOP_CLUSTERS):
+        """Cluster counts for the quality report (top is at most REPORT_TOP_CLUSTERS)."""
+        live = [[self._docs[doc_id][0], size] for doc_id, size in self._cluster_sizes.items()]
+        return {
+            "threshold": self.threshold,
+            "cluster_count": self.cluster_count,
+            "duplicate_count": self.duplicates,
+            "largest_clusters": _largest(self._closed_clusters + live)[:top],
+        }
+
+
+def _largest(clusters, top=REPORT_TOP_CLUSTERS):
+    """The top largest of a list of [label, size] clusters, largest first."""
+    return sorted(clusters, key=lambda x: (-x[1], str(x[0])))[:top]
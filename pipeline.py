@@ -0,0 +1,216 @@
+# Data Pipeline
+# Cleans, validates and filters articles in one pass: sample_data.json -> cleaned_output.json
+# (valid records only) + quality_report.txt, without writing and re-reading intermediate files.
+
+import argparse
+import os
+from contextlib import contextmanager
+from itertools import islice
+
+import instrument
+import jsoncodec
+from asyncpipeline import add_async_arguments, run_async
+from checkpoint import DEFAULT_EVERY, Checkpoint, file_identity, open_output
+from cleaner import (
+    add_cache_arguments, add_mmap_argument, check_mappable, clean_generated_at,
+    cleaning_rules_version, iter_clean, iter_clean_mapped, open_cache,
+)
+from dataio import (
+    FORMATS, add_compression_argument, detect_format, make_writer, open_articles, open_text,
+    read_articles, split_compression,
+)
+from dedup import UrlDeduper
+from mmapio import MappedEnvelope
+from validator import (
+    ValidationStats, add_near_dup_argument, add_near_duplicates, add_partial_argument,
+    check_near_duplicate, open_near_dup, write_partial, write_report,
+)
+
+
+@contextmanager
+def _cleaned_articles(input_path, input_format, workers, cache, skip, use_mmap):
+    """Yield (generated_at, iterator of cleaned articles after the first skip) for input_path."""
+    if use_mmap:
+        with MappedEnvelope(input_path) as mapped:
+            yield mapped.generated_at, iter_clean_mapped(mapped, workers, cache, skip)
+    else:
+        with open_articles(input_path, input_format) as (generated_at, articles):
+            yield generated_at, iter_clean(islice(articles, skip, None), workers, cache)
+
+
+def _replay_output(output_path, output_format, written, dedup, near_dup):
+    """
+    Rebuild dedup and near_dup for a resumed run. The first written articles of the
+    output are exactly the ones whose URLs dedup recorded and that near_dup indexed,
+    in the same order, so adding them again restores both without saving either.
+    """
+    if written == 0 or (dedup is None and near_dup is None):
+        return
+    with open_text(output_path) as f:
+        _, articles = read_articles(f, output_format)
+        for article in islice(articles, written):
+            if dedup is not None:
+                dedup.add(article.get("url"))
+            check_near_duplicate(article, near_dup)
+
+
+def run(input_path, output_path, report_path, workers=1, fmt=None, cache=None, dedup=None,
+        near_dup=None, checkpoint=None, partial_path=None, compact=False, compress_level=None,
+        use_mmap=False):
+    """
+    Clean each article of input_path, validate it right away and write only the
+    valid ones to output_path, then write the quality report to report_path.
+    Produces the same files as running cleaner.py followed by validator.py.
+    fmt forces "json" or "jsonl" for both files; by default each follows its extension.
+    cache is an optional CleanCache. With a UrlDeduper as dedup, articles whose URL
+    was already seen are dropped and counted as duplicate_url. With a
+    NearDuplicateDetector as near_dup, near-duplicate clusters among the valid
+    articles are added to the report. With a Checkpoint, progress is saved every
+    checkpoint.every articles and a run that finds a checkpoint from an interrupted
+    run continues from it; the outputs are the same as for an uninterrupted run.
+    With partial_path, the raw validation counters are also saved there for merge_stats.py.
+    compact writes compact JSON instead of the indented default. Files ending in
+    .gz/.bz2/.xz/.zst are read and written compressed (output at compress_level).
+    use_mmap reads an uncompressed JSON input through a memory map (see mmapio).
+    Returns the validation result dict.
+    """
+    input_format = detect_format(input_path, fmt)
+    output_format = detect_format(output_path, fmt)
+    if use_mmap:
+        check_mappable(input_path, input_format)
+    stats = ValidationStats()
+    state = None
+    if checkpoint is not None:
+        if split_compression(output_path)[1]:
+            raise ValueError("Checkpoints need an uncompressed output file")
+        state = checkpoint.load({
+            "input": file_identity(input_path),
+            "output": os.path.abspath(output_path),
+            "formats": [input_format, output_format],
+            "cleaning_rules": cleaning_rules_version(),
+            "dedup": dedup is not None,
+            "near_dup": near_dup.threshold if near_dup is not None else None,
+            "compact": compact,
+        })
+    if state is not None:
+        stats = ValidationStats.from_counters(state["counters"])
+        _replay_output(output_path, output_format, state["written"], dedup, near_dup)
+        print(f"Resuming after {state['articles_read']} articles from {checkpoint.path}")
+    articles_read = state["articles_read"] if state is not None else 0
+
+    if checkpoint is not None:
+        fout = open_output(output_path, state)
+    else:
+        fout = open_text(output_path, "w", compress_level)
+    with _cleaned_articles(input_path, input_format, workers, cache, articles_read, use_mmap) \
+            as (generated_at, cleaned), fout:
+        writer = make_writer(fout, output_format, clean_generated_at(generated_at),
+                             state["written"] if state is not None else None, compact)
+        for article in cleaned:
+            is_valid, _ = stats.add(article, dedup)
+            if is_valid:
+                writer.write(article)
+                check_near_duplicate(article, near_dup)
+            articles_read += 1
+            if checkpoint is not None and checkpoint.due(articles_read):
+                checkpoint.save(fout, articles_read, writer.count, stats.counters())
+        writer.close()
+
+    result = add_near_duplicates(stats.result(), near_dup)
+    with instrument.stage("write_report"):
+        write_report(result, report_path)
+    if partial_path:
+        write_partial(stats, partial_path)
+    if checkpoint is not None:
+        checkpoint.remove()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and validate article data in one pass.")
+    parser.add_argument("input", nargs="?", default="sample_data.json")
+    parser.add_argument("output", nargs="?", default="cleaned_output.json")
+    parser.add_argument("report", nargs="?", default="quality_report.txt")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes used to clean large inputs (default: 1)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="file format for input and output (default: jsonl for .jsonl/.ndjson, else json)",
+    )
+    add_cache_arguments(parser)
+    add_mmap_argument(parser)
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="treat articles whose normalized URL was already seen as invalid (duplicate_url)",
+    )
+    add_near_dup_argument(parser)
+    add_partial_argument(parser)
+    add_async_arguments(parser)
+    jsoncodec.add_json_arguments(parser)
+    add_compression_argument(parser)
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="save progress to PATH while running and resume from it after an interruption",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_EVERY,
+        metavar="N",
+        help=f"articles between checkpoints (default: {DEFAULT_EVERY})",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="record per-stage timings and byte counts and write them to <report>.stats.json",
+    )
+    args = parser.parse_args(argv)
+    jsoncodec.set_backend(args.json_backend)
+    if args.use_async and args.checkpoint:
+        parser.error("--async cannot be combined with --checkpoint")
+    if args.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+    cache = open_cache(args)
+    if args.stats:
+        instrument.enable()
+
+    try:
+        with instrument.stage("total"):
+            dedup = UrlDeduper() if args.dedup else None
+            if args.use_async:
+                result = run_async(args.input, args.output, args.report, args.workers, args.format, cache,
+                                   dedup, open_near_dup(args), args.partial, args.compact,
+                                   args.compress_level, args.mmap, args.queue_size)
+            else:
+                checkpoint = Checkpoint(args.checkpoint, args.checkpoint_every) if args.checkpoint else None
+                result = run(args.input, args.output, args.report, args.workers, args.format, cache,
+                             dedup, open_near_dup(args), checkpoint, args.partial, args.compact,
+                             args.compress_level, args.mmap)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"Cleaned {result['total_records']} articles")
+    print(f"Generated {args.report}")
+    print(f"Saved {result['valid_count']} valid records to {args.output}")
+    if cache is not None:
+        print(cache.summary())
+    if args.stats:
+        instrument.count("articles", result["total_records"])
+        instrument.count_file("bytes_in", args.input)
+        instrument.count_file("bytes_out", args.output)
+        instrument.count_file("bytes_out", args.report)
+        instrument.disable()
+        stats_path = instrument.stats_path(args.report)
+        instrument.write_stats(stats_path)
+        print(f"Wrote stats -> {stats_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# Cleaning Service
+# Long-running local HTTP server exposing clean_article and validate_record, so other programs
+# can clean articles without starting Python and importing the cleaner for every file.
+# Articles from concurrent requests are grouped into micro-batches before they are cleaned,
+# and each response streams one JSON line per article as its batch finishes.
+# The server only listens on the loopback interface (127.0.0.1).
+
+import argparse
+import io
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jsoncodec
+from article import from_json, to_json
+from cleaner import clean_chunk
+from dataio import read_jsonl
+from validator import validate_record
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# A batch is sent for processing once it has this many articles, or once its first
+# request has waited DEFAULT_MAX_WAIT seconds for others to join it.
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 0.005
+
+# Larger request bodies are refused with 413.
+MAX_BODY_BYTES = 64 << 20
+
+_STOP = object()
+
+
+def _validate_chunk(articles):
+    """validate_record for each article, as JSON-ready dicts."""
+    results = []
+    for article in articles:
+        is_valid, errors = validate_record(article)
+        results.append({"valid": is_valid, "errors": errors})
+    return results
+
+
+class MicroBatcher:
+    """
+    Groups the articles of concurrent submit() calls into batches of up to max_batch,
+    waiting at most max_wait seconds for a batch to fill, and runs func(batch) for each
+    on executor. At most max_in_flight batches run at once; further requests queue up.
+    """
+
+    def __init__(self, func, executor, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT,
+                 max_in_flight=1):
+        self.func = func
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, articles):
+        """Future for the list of func results for articles (at most max_batch of them)."""
+        future = Future()
+        self._requests.put((articles, future))
+        return future
+
+    def _collect(self, first):
+        """first plus the requests that arrive before the batch is full or max_wait has passed."""
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                self._requests.put(_STOP)
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self):
+        while (first := self._requests.get()) is not _STOP:
+            batch = self._collect(first)
+            self._slots.acquire()
+            articles = [article for request_articles, _ in batch for article in request_articles]
+            try:
+                future = self.executor.submit(self.func, articles)
+            except Exception as e:
+                self._slots.release()
+                for _, request_future in batch:
+                    request_future.set_exception(e)
+                continue
+            future.add_done_callback(partial(self._finish, batch))
+
+    def _finish(self, batch, future):
+        """Hand each request its slice of the batch's results."""
+        self._slots.release()
+        try:
+            results = future.result()
+        except Exception as e:
+            for _, request_future in batch:
+                request_future.set_exception(e)
+            return
+        start = 0
+        for articles, request_future in batch:
+            request_future.set_result(results[start:start + len(articles)])
+            start += len(articles)
+
+    def close(self):
+        """Stop taking batches once the queued requests have been sent off."""
+        self._requests.put(_STOP)
+        self._thread.join()
+
+
+def parse_articles(body):
+    """
+    Articles in a request body: a JSON object (one article), a JSON array (a batch)
+    or JSON Lines (one article per line). Raises ValueError for anything else.
+    """
+    text = body.decode("utf-8")
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return list(read_jsonl(io.StringIO(text)))
+    if isinstance(value, list):
+        return [from_json(v) for v in value]
+    return [from_json(value)]
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    POST /clean and POST /validate take articles (see parse_articles) and stream back
+    application/x-ndjson: one cleaned article, or one {"valid": ..., "errors": [...]},
+    per input article and in input order. GET /health answers {"status": "ok"}.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ArticleCleaner/1.0"
+    # Responses are written in several small pieces; don't let Nagle's algorithm hold them back.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, obj):
+        body = (json.dumps(obj) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        batcher = self.server.batchers.get(self.path)
+        if batcher is None:
+            self.close_connection = True  # the request body is not read
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            self.close_connection = True
+            self._send_json(411, {"error": "A valid Content-Length is required"})
+            return
+        if int(length) > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": f"Request body is larger than {MAX_BODY_BYTES} bytes"})
+            return
+        try:
+            articles = parse_articles(self.rfile.read(int(length)))
+        except (UnicodeDecodeError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        # Submit every slice first so a large request fills whole batches, then stream in order.
+        futures = [
+            batcher.submit(articles[i:i + batcher.max_batch])
+            for i in range(0, len(articles), batcher.max_batch)
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for future in futures:
+                results = future.result()
+                lines = "".join(jsoncodec.dumps(r, default=to_json) + "\n" for r in results)
+                self._write_chunk(lines.encode("utf-8"))
+        except Exception as e:
+            # The status line is already sent: report the failure as the last line.
+            self._write_chunk((json.dumps({"error": str(e)}) + "\n").encode("utf-8"))
+        self._write_chunk(b"")
+
+
+class CleaningServer(ThreadingHTTPServer):
+    """HTTP server on 127.0.0.1:port with one MicroBatcher per endpoint."""
+
+    daemon_threads = True
+    request_queue_size = 128  # many clients connecting at once
+
+    def __init__(self, port=DEFAULT_PORT, workers=1, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait=DEFAULT_MAX_WAIT, verbose=False):
+        if workers > 1:
+            self.clean_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.clean_executor = ThreadPoolExecutor(max_workers=1)
+        # Validation is too cheap to be worth sending to other processes.
+        self.validate_executor = ThreadPoolExecutor(max_workers=1)
+        self.batchers = {
+            "/clean": MicroBatcher(clean_chunk, self.clean_executor, max_batch, max_wait,
+                                   max(workers, 1) + 1),
+            "/validate": MicroBatcher(_validate_chunk, self.validate_executor, max_batch, max_wait),
+        }
+        self.verbose = verbose
+        super().__init__((HOST, port), ServiceHandler)
+
+    def server_close(self):
+        super().server_close()
+        for batcher in self.batchers.values():
+            batcher.close()
+        self.clean_executor.shutdown()
+        self.validate_executor.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve article cleaning and validation over local HTTP.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"(default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes cleaning batches (default: 1, in the server process)",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=DEFAULT_MAX_BATCH,
+        metavar="N",
+        help=f"most articles cleaned in one batch (default: {DEFAULT_MAX_BATCH})",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT * 1000,
+        metavar="MS",
+        help=f"longest a request waits for others to join its batch (default: {DEFAULT_MAX_WAIT * 1000:g})",
+    )
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    if args.max_batch < 1:
+        parser.error("--max-batch must be at least 1")
+
+    server = CleaningServer(args.port, args.workers, args.max_batch, args.max_wait_ms / 1000,
+                            args.verbose)
+    print(f"Serving on http://{HOST}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Cleaning Service Client
+# Sends articles to a running service.py on this machine and reads back its streamed JSON Lines.
+#   python3 service_client.py clean sample_data.json cleaned.jsonl
+#   python3 service_client.py validate cleaned.jsonl
+
+import argparse
+import http.client
+import json
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+import jsoncodec
+from article import from_json, to_json
+from dataio import detect_format, open_articles, open_text
+from service import DEFAULT_PORT, HOST
+
+# Articles sent per HTTP request; the server splits them into its own micro-batches.
+DEFAULT_REQUEST_SIZE = 1000
+
+
+class ServiceClient:
+    """Client for service.py on 127.0.0.1:port. Reuses one keep-alive connection."""
+
+    def __init__(self, port=DEFAULT_PORT, timeout=60, request_size=DEFAULT_REQUEST_SIZE):
+        self.request_size = request_size
+        self._connection = http.client.HTTPConnection(HOST, port, timeout=timeout)
+
+    def _post(self, path, articles):
+        """POST a list of articles to path and yield the decoded response lines."""
+        body = jsoncodec.dumps(list(articles), default=to_json).encode("utf-8")
+        self._connection.request("POST", path, body, {"Content-Type": "application/json"})
+        response = self._connection.getresponse()
+        if response.status != 200:
+            error = json.loads(response.read() or b"{}").get("error", response.reason)
+            raise ValueError(f"{path} failed with HTTP {response.status}: {error}")
+        for line in response:
+            value = json.loads(line)
+            if isinstance(value, dict) and value.keys() == {"error"}:
+                raise RuntimeError(f"{path} failed on the server: {value['error']}")
+            yield value
+
+    def _stream(self, path, articles):
+        articles = iter(articles)
+        while batch := list(islice(articles, self.request_size)):
+            yield from self._post(path, batch)
+
+    def clean(self, articles):
+        """Yield the cleaned Article for each article, in order."""
+        for value in self._stream("/clean", articles):
+            yield from_json(value)
+
+    def validate(self, articles):
+        """Yield (is_valid, errors) for each article, in order."""
+        for value in self._stream("/validate", articles):
+            yield value["valid"], value["errors"]
+
+    def health(self):
+        """True if the service answers its health check."""
+        self._connection.request("GET", "/health")
+        response = self._connection.getresponse()
+        return response.status == 200 and json.loads(response.read()).get("status") == "ok"
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean or validate articles through a running service.py.")
+    parser.add_argument("command", choices=("clean", "validate"))
+    parser.add_argument("input", help="article file (JSON or JSON Lines, optionally compressed)")
+    parser.add_argument("output", nargs="?", help="JSON Lines results (default: standard output)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"(default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--request-size",
+        type=int,
+        default=DEFAULT_REQUEST_SIZE,
+        metavar="N",
+        help=f"articles sent per request (default: {DEFAULT_REQUEST_SIZE})",
+    )
+    args = parser.parse_args(argv)
+    if args.request_size < 1:
+        parser.error("--request-size must be at least 1")
+
+    with ServiceClient(args.port, request_size=args.request_size) as client, \
+            open_articles(args.input, detect_format(args.input)) as (_, articles):
+        if args.command == "clean":
+            results = client.clean(articles)
+        else:
+            results = ({"valid": v, "errors": e} for v, e in client.validate(articles))
+        with open_text(args.output, "w") if args.output else nullcontext(sys.stdout) as fout:
+            for result in results:
+                fout.write(jsoncodec.dumps(result, default=to_json) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# Sharded Pipeline
+# Runs the clean + validate pipeline over many input files (a directory or glob) in a pool of
+# worker processes, writing each file's outputs separately plus one merged quality_report.txt.
+
+import argparse
+import glob
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import jsoncodec
+import pipeline
+from dataio import FORMATS, JSONL_EXTENSIONS, add_compression_argument, split_compression
+from dedup import UrlDeduper
+from validator import merge_stats, read_partial, write_partial, write_report
+
+
+# Extensions picked up when a directory is given as input.
+INPUT_EXTENSIONS = (".json",) + JSONL_EXTENSIONS
+
+
+def _split_name(path):
+    """(stem, extension, compression extension) of path: dir/a.jsonl.gz -> (a, .jsonl, .gz)."""
+    name = os.path.basename(path)
+    base, _ = split_compression(name)
+    stem, ext = os.path.splitext(base)
+    return stem, ext, name[len(base):]
+
+
+def iter_inputs(patterns):
+    """
+    Yield input paths for each pattern, in sorted order per pattern: the .json/.jsonl/.ndjson
+    files (optionally compressed) directly inside a directory, or the files matching a glob.
+    """
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths = (
+                entry.path for entry in os.scandir(pattern)
+                if entry.is_file() and _split_name(entry.name)[1].lower() in INPUT_EXTENSIONS
+            )
+        else:
+            paths = glob.iglob(pattern)
+        yield from sorted(paths)
+
+
+def shard_paths(input_path, output_dir):
+    """(output, report, partial) paths for one input file inside output_dir; compression is kept."""
+    stem, ext, compression = _split_name(input_path)
+    return (
+        os.path.join(output_dir, f"{stem}.cleaned{ext}{compression}"),
+        os.path.join(output_dir, f"{stem}.quality_report.txt"),
+        os.path.join(output_dir, f"{stem}.partial.json"),
+    )
+
+
+def run_shard(input_path, output_dir, fmt=None, dedup=False, compact=False, compress_level=None):
+    """Run pipeline.run on one input file (in a worker process). Returns its partial stats path."""
+    output_path, report_path, partial_path = shard_paths(input_path, output_dir)
+    pipeline.run(input_path, output_path, report_path, fmt=fmt,
+                 dedup=UrlDeduper() if dedup else None, partial_path=partial_path, compact=compact,
+                 compress_level=compress_level)
+    return partial_path
+
+
+def run_shards(inputs, output_dir, report_path, jobs=1, fmt=None, dedup=False, compact=False,
+               compress_level=None):
+    """
+    Run every input file through the pipeline with up to jobs processes, then merge
+    the per-file stats into report_path. At most 2 * jobs files are queued at a time,
+    so a long list of inputs is never submitted all at once.
+    Returns (merged ValidationStats, number of files, list of (path, error) failures).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stems = set()
+    partials = []
+    failures = []
+
+    def collect(path, future):
+        try:
+            partials.append(read_partial(future.result()))
+            print(f"Done {path}")
+        except Exception as e:
+            failures.append((path, e))
+            print(f"Failed {path}: {e}")
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        in_flight = deque()
+        for path in inputs:
+            stem = _split_name(path)[0]
+            if stem in stems:
+                raise ValueError(f"Two inputs are named {stem!r}; their outputs would collide")
+            stems.add(stem)
+            if len(in_flight) >= 2 * jobs:
+                collect(*in_flight.popleft())
+            in_flight.append((path, executor.submit(
+                run_shard, path, output_dir, fmt, dedup, compact, compress_level)))
+        while in_flight:
+            collect(*in_flight.popleft())
+
+    stats = merge_stats(partials)
+    write_report(stats.result(), report_path)
+    return stats, len(stems), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and validate many article files in parallel.")
+    parser.add_argument("inputs", nargs="+", metavar="INPUT", help="input directory or glob (quote it)")
+    parser.add_argument(
+        "--output-dir",
+        default="shards_output",
+        help="directory for per-file outputs and reports (default: shards_output)",
+    )
+    parser.add_argument(
+        "--report",
+        help="merged quality report (default: <output-dir>/quality_report.txt)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of files processed at once (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="file format for inputs and outputs (default: jsonl for .jsonl/.ndjson, else json)",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="drop articles whose normalized URL was already seen in the same file (duplicate_url)",
+    )
+    jsoncodec.add_json_arguments(parser)
+    add_compression_argument(parser)
+    args = parser.parse_args(argv)
+    jsoncodec.set_backend(args.json_backend)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    report_path = args.report or os.path.join(args.output_dir, "quality_report.txt")
+
+    stats, count, failures = run_shards(
+        iter_inputs(args.inputs), args.output_dir, report_path, args.jobs, args.format, args.dedup,
+        args.compact, args.compress_level,
+    )
+    write_partial(stats, os.path.splitext(report_path)[0] + ".partial.json")
+    print(f"Processed {count - len(failures)} of {count} files ({stats.total} articles)")
+    print(f"Generated {report_path}")
+    if failures:
+        raise SystemExit(f"{len(failures)} file(s) failed; the merged report covers the others")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# Test configuration
+# The modules under test are plain scripts at the repository root; make them importable.
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,83 @@
+# checkpoint.py
+# A run that is killed and resumed from its checkpoint must write the same files as one that is not.
+
+import json
+import os
+
+import pytest
+
+import pipeline
+from checkpoint import Checkpoint
+from conftest import ROOT
+from dedup import UrlDeduper
+from neardup import NearDuplicateDetector
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingCheckpoint(Checkpoint):
+    """Checkpoint that stops the run once crash_at articles have been read."""
+
+    def __init__(self, path, every, crash_at):
+        super().__init__(path, every)
+        self.crash_at = crash_at
+
+    def due(self, articles_read):
+        if articles_read == self.crash_at:
+            raise Crash()
+        return super().due(articles_read)
+
+
+def _corpus(path):
+    """sample_data.json with repeated URLs (some spelled differently) and content under new URLs."""
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    articles = data["articles"]
+    repeats = [dict(a, url=a["url"].replace("https://", "http://") + "/") for a in articles[::3]]
+    syndicated = [dict(a, url=f"https://mirror.example.com/{i}") for i, a in enumerate(articles[::2])]
+    data["articles"] = articles + repeats + syndicated + articles[:10]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return len(data["articles"])
+
+
+def _run(input_path, output, report, options, checkpoint=None):
+    return pipeline.run(
+        input_path, output, report, dedup=UrlDeduper() if "dedup" in options else None,
+        near_dup=NearDuplicateDetector() if "near_dup" in options else None, checkpoint=checkpoint,
+    )
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("output_name", ["out.json", "out.jsonl"])
+@pytest.mark.parametrize("options", [(), ("dedup",), ("near_dup",), ("dedup", "near_dup")])
+def test_resume_matches_uninterrupted_run(tmp_path, output_name, options):
+    input_path = str(tmp_path / "input.json")
+    count = _corpus(input_path)
+    expected_output = str(tmp_path / f"expected-{output_name}")
+    expected = _run(input_path, expected_output, str(tmp_path / "expected.txt"), options)
+    if "dedup" in options:
+        assert expected["error_counts"].get("duplicate_url")
+    if "near_dup" in options:
+        assert expected["near_duplicates"]["duplicate_count"]
+
+    output = str(tmp_path / output_name)
+    report = str(tmp_path / "report.txt")
+    checkpoint_path = str(tmp_path / "run.checkpoint")
+    # Crash twice between checkpoints, so each resume has to cut back output written after one.
+    for crash_at in (count // 3 + 4, 2 * count // 3 + 2):
+        with pytest.raises(Crash):
+            _run(input_path, output, report, options, CrashingCheckpoint(checkpoint_path, 9, crash_at))
+        assert os.path.exists(checkpoint_path)
+    result = _run(input_path, output, report, options, Checkpoint(checkpoint_path, 9))
+
+    assert result == expected
+    assert _read(output) == _read(expected_output)
+    assert _read(report) == _read(str(tmp_path / "expected.txt"))
+    assert not os.path.exists(checkpoint_path)
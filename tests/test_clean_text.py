@@ -0,0 +1,87 @@
+# clean_text equivalence
+# The optimized clean_text must return exactly what the original implementation did,
+# on the sample data and on random strings built from the characters it treats specially.
+
+import html
+import json
+import os
+import random
+import re
+
+import pytest
+
+from cleaner import INVISIBLE_TO_SPACE, clean_text
+from conftest import ROOT
+
+
+def baseline_clean_text(value):
+    """Frozen copy of clean_text as it was before it was optimized."""
+    if value is None or not isinstance(value, str):
+        return ""
+
+    s = value
+
+    for char in INVISIBLE_TO_SPACE:
+        s = s.replace(char, " ")
+
+    s = html.unescape(s)
+
+    s = re.sub(r"<[^>]+>", "", s)
+
+    s = re.sub(r"\s+", " ", s).strip()
+
+    s = "".join(
+        c for c in s
+        if ord(c) >= 32 or c in "\t\n\r"
+    )
+    s = "".join(c for c in s if ord(c) != 127)
+
+    return s
+
+
+FIELDS = ("url", "title", "content", "published")
+
+# Building blocks for fuzzed strings: entities (valid, numeric, broken), tags and
+# tag-like text, invisible characters, whitespace, control characters and DEL.
+FRAGMENTS = (
+    "&amp;", "&nbsp;", "&quot;", "&lt;p&gt;", "&#8217;", "&#x2014;", "&rsquo;", "&copy;",
+    "&amp", "&#;", "&bogus;", "&", "&&", "&#0;", "&#127;", "&#x1f;",
+    "<p>", "</p>", "<br/>", "<a href='x'>", "<", ">", "<>", "< b >", "<<i>>",
+    "\u00a0", "\u200b", "\u200c", "\u200d", "\ufeff",
+    " ", "  ", "\t", "\n", "\r", "\r\n", "\x0b", "\x0c", "\x1c", "\x85", "\u2028", "\u3000",
+    "\x00", "\x01", "\x08", "\x1b", "\x1f", "\x7f", "\x7f\x7f",
+    "word", "Hello", "\u00a9", "\u00ae", "\u2122", "\u00fc", "\u65e5\u672c", "\U0001f600",
+)
+
+FUZZ_CASES = 5000
+
+
+def _sample_values():
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    return [(i, field, article.get(field)) for i, article in enumerate(articles) for field in FIELDS]
+
+
+@pytest.mark.parametrize("index, field, value", _sample_values())
+def test_sample_data_matches_baseline(index, field, value):
+    assert clean_text(value) == baseline_clean_text(value)
+
+
+def test_fuzzed_strings_match_baseline():
+    rng = random.Random(20260201)
+    for _ in range(FUZZ_CASES):
+        value = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+        assert clean_text(value) == baseline_clean_text(value), repr(value)
+
+
+def test_fuzzed_code_points_match_baseline():
+    # Arbitrary code points below 0x3000 reach every branch, including unusual whitespace.
+    rng = random.Random(7)
+    for _ in range(FUZZ_CASES):
+        value = "".join(chr(rng.randrange(0x3001)) for _ in range(rng.randint(0, 40)))
+        assert clean_text(value) == baseline_clean_text(value), repr(value)
+
+
+@pytest.mark.parametrize("value", [None, 0, 1.5, [], {}, b"bytes"])
+def test_non_strings_match_baseline(value):
+    assert clean_text(value) == baseline_clean_text(value) == ""
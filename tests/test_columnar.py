@@ -0,0 +1,52 @@
+# columnar.py
+# validator.py validates through validate_batch, with NumPy when installed and pure Python otherwise.
+
+import json
+import os
+
+import pytest
+
+import columnar
+import validator
+from columnar import ArticleBatch, validate_batch
+from conftest import ROOT
+
+ODD_RECORDS = [
+    None,
+    "text",
+    {"title": "t"},
+    {"url": "ftp://example.com/a", "title": "A", "content": "x" * 60},
+    {"url": " https://example.com/b ", "title": " ", "content": "short", "published": 3},
+]
+
+
+def _validate_files(tmp_path, name, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(columnar, "np", None)
+    input_path = str(tmp_path / name)
+    report_path = str(tmp_path / f"{name}.txt")
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["articles"] += ODD_RECORDS
+    with open(input_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    validator.main([input_path, report_path])
+    with open(input_path, "rb") as f, open(report_path, "rb") as g:
+        return f.read(), g.read()
+
+
+@pytest.mark.skipif(columnar.np is None, reason="NumPy is not installed")
+def test_numpy_and_pure_python_reports_are_identical(tmp_path, monkeypatch):
+    with_numpy = _validate_files(tmp_path, "numpy.json", monkeypatch, True)
+    without_numpy = _validate_files(tmp_path, "python.json", monkeypatch, False)
+    assert with_numpy == without_numpy
+    assert b"invalid_record: 2\n" in with_numpy[1]
+
+
+def test_fallback_without_numpy(monkeypatch):
+    batch = ArticleBatch.from_articles(ODD_RECORDS)
+    expected = validate_batch(batch, use_numpy=False)
+    monkeypatch.setattr(columnar, "np", None)
+    assert validate_batch(batch) == expected
+    with pytest.raises(ImportError):
+        validate_batch(batch, use_numpy=True)
@@ -0,0 +1,114 @@
+# dataio.py
+# Streaming JSON reads and atomic text and binary output files.
+
+import gzip
+import io
+import json
+import os
+import shutil
+
+import pytest
+
+import dataio
+from article import to_json
+from articleindex import build_index, load_index, read_article
+from conftest import ROOT
+from dataio import AtomicFile, find_generated_at, open_articles, open_text, read_envelope
+
+
+def test_atomic_file_writes_bytes(tmp_path):
+    path = str(tmp_path / "data.bin")
+    with AtomicFile(path) as f:
+        f.write(b"\x00\x01")
+        f.write(bytes(range(256)))
+        assert not os.path.exists(path)
+    with open(path, "rb") as f:
+        assert f.read() == b"\x00\x01" + bytes(range(256))
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+def test_atomic_file_compresses(tmp_path):
+    path = str(tmp_path / "data.bin.gz")
+    with AtomicFile(path) as f:
+        f.write(b"payload" * 100)
+    with gzip.open(path, "rb") as f:
+        assert f.read() == b"payload" * 100
+
+
+@pytest.mark.parametrize("opener", [AtomicFile, lambda path: open_text(path, "w")])
+def test_failed_write_leaves_old_file(tmp_path, opener):
+    path = str(tmp_path / "data.out")
+    with open(path, "wb") as f:
+        f.write(b"old")
+    with pytest.raises(RuntimeError):
+        with opener(path) as f:
+            f.write(b"new" if isinstance(f, AtomicFile) else "new")
+            raise RuntimeError("stop")
+    with open(path, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(tmp_path) == ["data.out"]
+
+
+def test_text_file_still_atomic(tmp_path):
+    path = str(tmp_path / "text.txt.gz")
+    with open_text(path, "w") as f:
+        f.write("café\n")
+    with open_text(path) as f:
+        assert f.read() == "café\n"
+
+
+def test_article_index_round_trip(tmp_path):
+    path = str(tmp_path / "sample_data.json")
+    shutil.copy(os.path.join(ROOT, "sample_data.json"), path)
+    built = build_index(path)
+    loaded = load_index(path)
+    assert len(loaded) == len(built) > 0
+    assert list(loaded.spans()) == list(built.spans())
+    assert read_article(path, 0, loaded)
+
+
+NUMBER_DOCUMENTS = [
+    '{"articles": [-25000000000.0, 2]}',
+    '{"generated_at": 1769.25, "articles": [1e-7, 1E+22, -0, 3.5e10, {"n": 12345.5}]}',
+    '{"articles": [{"url": "u", "n": 1769.5}], "scrape_seconds": 12345.5}',
+    '{"generated_at": "x", "articles": [1, 22, 333, -4444.0e-1, [5.5, 66]], "total": -7.25E3}',
+]
+
+
+@pytest.mark.parametrize("document", NUMBER_DOCUMENTS)
+def test_numbers_cut_at_chunk_boundaries(document):
+    expected = json.loads(document)
+    for chunk_size in range(1, len(document) + 2):
+        generated_at, articles = read_envelope(io.StringIO(document), chunk_size, late_generated_at=True)
+        assert list(articles) == expected["articles"], chunk_size
+        if "generated_at" in document.split('"articles"')[0]:
+            assert generated_at == expected["generated_at"]
+
+
+@pytest.mark.parametrize("name", ["late.json", "late.json.gz"])
+@pytest.mark.parametrize("generated_at", ["2026-02-01T10:00:00", None])
+def test_open_articles_streams_late_generated_at(tmp_path, monkeypatch, name, generated_at):
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        articles = json.load(f)["articles"]
+    data = {"articles": articles, "scrape_seconds": 12.5}
+    if generated_at is not None:
+        data["generated_at"] = generated_at
+    path = str(tmp_path / name)
+    with open_text(path, "w") as f:
+        json.dump(data, f)
+
+    def load_data(f, fmt):
+        raise AssertionError("the whole file was loaded")
+
+    monkeypatch.setattr(dataio, "load_data", load_data)
+    with open_articles(path, "json") as (found, records):
+        assert found == generated_at
+        assert [json.loads(json.dumps(r, default=to_json)) for r in records] == articles
+
+
+def test_find_generated_at_small_chunks():
+    document = '{"articles": [{"a": [1, 2.5]}, "x"], "n": -1.5e3, "generated_at": "g", "z": 0}'
+    for chunk_size in range(1, 12):
+        assert find_generated_at(io.StringIO(document), chunk_size) == "g"
+    assert find_generated_at(io.StringIO('{"articles": [1]}')) is None
+    assert find_generated_at(io.StringIO("{}")) is None
@@ -0,0 +1,48 @@
+# jsoncodec.py
+# Every backend must write the same text as the json module, floats included.
+
+import json
+import math
+
+import pytest
+
+import jsoncodec
+import validator
+from article import Article, to_json
+
+FLOATS = [math.nan, math.inf, -math.inf, 1e16, 1.5e-7, 0.00001, 1769.5, -0.0, 1.7976931348623157e308]
+VALUES = [
+    {"url": "u", "score": math.nan},
+    {"articles": [{"n": f} for f in FLOATS], "generated_at": "2026-02-01"},
+    [1, "two", [3.0, {"x": 1e+22}], None, True],
+    Article("https://example.com/", "t", "c", 1e16),
+    {"articles": [Article("u", "t", "c", "p"), {"score": -math.inf}]},
+    {"plain": ["strings", "only", 1, None]},
+]
+
+
+@pytest.fixture(params=jsoncodec.available_backends())
+def backend(request):
+    previous = jsoncodec.backend()
+    jsoncodec.set_backend(request.param)
+    yield request.param
+    jsoncodec.set_backend(previous)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_same_output_as_json(backend, value):
+    assert jsoncodec.dumps(value, pretty=True, default=to_json) == \
+        json.dumps(value, indent=2, ensure_ascii=False, default=to_json)
+    assert jsoncodec.dumps(value, default=to_json) == \
+        json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=to_json)
+
+
+def test_validator_keeps_non_finite_values(backend, tmp_path):
+    text = '{"url": "https://example.com/a", "title": "T", "score": NaN, "big": 1e+16, ' \
+        '"content": "' + "x" * 60 + '"}'
+    path = tmp_path / "cleaned.json"
+    path.write_text('{\n  "generated_at": "2026",\n  "articles": [\n    ' + text + '\n  ]\n}', encoding="utf-8")
+    validator.main([str(path), str(tmp_path / "report.txt")])
+    saved = path.read_text(encoding="utf-8")
+    assert '"score": NaN' in saved
+    assert '"big": 1e+16' in saved
@@ -0,0 +1,33 @@
+# neardup.py
+# Near-duplicate clusters are reported correctly while the detector's memory stays bounded.
+
+from collections import Counter
+from random import Random
+
+from neardup import REPORT_TOP_CLUSTERS, NearDuplicateDetector
+
+
+def _stories(count, seed=3):
+    rng = Random(seed)
+    words = [f"word{i}" for i in range(500)]
+    return [" ".join(rng.choice(words) for _ in range(40)) for _ in range(count)]
+
+
+def test_summary_with_bounded_index():
+    stories = _stories(60)
+    rng = Random(11)
+    detector = NearDuplicateDetector(max_docs=20)
+    matches = Counter()
+    for i in range(3000):
+        label = detector.add(f"https://example.com/{i}", rng.choice(stories))
+        if label is not None:
+            matches[label] += 1
+        assert len(detector._cluster_sizes) <= detector.max_docs
+        assert len(detector._closed_clusters) <= REPORT_TOP_CLUSTERS
+
+    sizes = sorted(((label, count + 1) for label, count in matches.items()), key=lambda x: (-x[1], x[0]))
+    assert len(matches) > detector.max_docs  # many clusters were closed when their first article was dropped
+    summary = detector.summary()
+    assert summary["cluster_count"] == len(matches)
+    assert summary["duplicate_count"] == sum(matches.values())
+    assert summary["largest_clusters"] == [list(c) for c in sizes[:REPORT_TOP_CLUSTERS]]
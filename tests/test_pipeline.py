@@ -0,0 +1,87 @@
+# pipeline.py
+# The one-pass pipeline must write the same files as cleaner.py followed by validator.py.
+
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+import cleaner
+import pipeline
+import validator
+from asyncpipeline import run_async
+from conftest import ROOT
+from dedup import UrlDeduper
+
+
+def _sample():
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write(path, data):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _two_scripts(tmp_path, input_path):
+    """Output and report of cleaner.py then validator.py on input_path."""
+    output = str(tmp_path / "sequential.json")
+    report = str(tmp_path / "sequential_report.txt")
+    cleaner.main([input_path, output])
+    validator.main([output, report])
+    return _read(output), _read(report)
+
+
+@pytest.mark.parametrize("name", ["late.json", "late.json.gz"])
+@pytest.mark.parametrize("run", [pipeline.run, run_async])
+def test_generated_at_after_articles(tmp_path, name, run):
+    sample = _sample()
+    data = {"articles": sample["articles"], "generated_at": sample["generated_at"]}
+    input_path = str(tmp_path / name)
+    _write(input_path, data)
+    plain_path = str(tmp_path / "late_plain.json")
+    _write(plain_path, data)
+
+    output = str(tmp_path / "out.json")
+    report = str(tmp_path / "report.txt")
+    run(input_path, output, report)
+
+    assert (_read(output), _read(report)) == _two_scripts(tmp_path, plain_path)
+    assert json.loads(_read(output))["generated_at"]
+
+
+def test_sample_data_matches_two_scripts(tmp_path):
+    input_path = str(tmp_path / "sample_data.json")
+    shutil.copy(os.path.join(ROOT, "sample_data.json"), input_path)
+    output = str(tmp_path / "out.json")
+    report = str(tmp_path / "report.txt")
+    pipeline.run(input_path, output, report)
+    assert (_read(output), _read(report)) == _two_scripts(tmp_path, input_path)
+
+
+@pytest.mark.parametrize("run", [pipeline.run, run_async])
+def test_dedup_keeps_valid_copy_after_invalid_one(tmp_path, run):
+    article = {
+        "url": "https://example.com/a",
+        "title": "A title",
+        "content": "Long enough content for the validator to accept this record as valid.",
+        "published": "2026-02-01T10:00:00",
+    }
+    invalid = dict(article, content="")
+    input_path = str(tmp_path / "dupes.json")
+    _write(input_path, {"generated_at": "2026-02-01", "articles": [invalid, article, article]})
+
+    output = str(tmp_path / "out.json")
+    result = run(input_path, output, str(tmp_path / "report.txt"), dedup=UrlDeduper())
+
+    assert len(json.loads(_read(output))["articles"]) == 1
+    assert result["error_counts"] == {"missing_content": 1, "duplicate_url": 1}
@@ -0,0 +1,157 @@
+# service.py and service_client.py
+# A CleaningServer on 127.0.0.1 (port 0) must answer every request with its own results, in order.
+
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+import service_client
+from article import from_json, to_json
+from cleaner import clean_article
+from conftest import ROOT
+from service import CleaningServer
+from service_client import ServiceClient
+from validator import validate_record
+
+
+def _sample_articles():
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["articles"]
+
+
+def _expected_clean(articles):
+    return [json.loads(json.dumps(clean_article(from_json(a)), default=to_json)) for a in articles]
+
+
+@pytest.fixture
+def server():
+    server = CleaningServer(port=0, max_batch=16, max_wait=0.1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _port(server):
+    return server.server_address[1]
+
+
+def _request(server, method, path, body=None, headers=None):
+    """(status, decoded JSON lines of the response)."""
+    connection = http.client.HTTPConnection("127.0.0.1", _port(server), timeout=30)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, [json.loads(line) for line in response.read().splitlines()]
+    finally:
+        connection.close()
+
+
+def _raw_request(server, head):
+    """Status code of a hand-written request (no body is sent)."""
+    connection = http.client.HTTPConnection("127.0.0.1", _port(server), timeout=30)
+    try:
+        connection.connect()
+        connection.sock.sendall(head)
+        response = http.client.HTTPResponse(connection.sock)
+        response.begin()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_object_array_and_jsonl_bodies(server):
+    articles = _sample_articles()[:40]
+    expected = _expected_clean(articles)
+
+    assert _request(server, "POST", "/clean", json.dumps(articles[0])) == (200, expected[:1])
+    assert _request(server, "POST", "/clean", json.dumps(articles)) == (200, expected)
+    jsonl = "".join(json.dumps(a) + "\n" for a in articles)
+    assert _request(server, "POST", "/clean", jsonl.encode("utf-8")) == (200, expected)
+
+    status, results = _request(server, "POST", "/validate", json.dumps(articles))
+    assert status == 200
+    assert [(r["valid"], r["errors"]) for r in results] == [validate_record(from_json(a)) for a in articles]
+
+
+def test_concurrent_requests_share_batches(server):
+    batch_sizes = []
+    batcher = server.batchers["/clean"]
+    clean = batcher.func
+
+    def recording(articles):
+        batch_sizes.append(len(articles))
+        return clean(articles)
+
+    batcher.func = recording
+    articles = _sample_articles()
+    requests = [articles[i:i + 5] for i in range(0, 60, 5)]
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def send(i):
+        barrier.wait()
+        results[i] = _request(server, "POST", "/clean", json.dumps(requests[i]))
+
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [(200, _expected_clean(r)) for r in requests]
+    assert max(batch_sizes) > 5  # at least one batch mixed articles from several requests
+    assert max(batch_sizes) <= batcher.max_batch
+
+
+def test_error_statuses(server):
+    assert _request(server, "GET", "/nope")[0] == 404
+    assert _request(server, "POST", "/nope", b"{}")[0] == 404
+    assert _request(server, "POST", "/clean", b"{not json")[0] == 400
+    assert _request(server, "POST", "/clean", b"\xff\xfe")[0] == 400
+    assert _raw_request(server, b"POST /clean HTTP/1.1\r\nHost: x\r\n\r\n")[0] == 411
+    status, body = _raw_request(
+        server, b"POST /clean HTTP/1.1\r\nHost: x\r\nContent-Length: 999999999999\r\n\r\n")
+    assert status == 413
+    assert "larger than" in body["error"]
+
+
+def test_failed_batch_ends_stream_with_error_line(server):
+    def fail(articles):
+        raise RuntimeError("cleaning exploded")
+
+    server.batchers["/clean"].func = fail
+    status, lines = _request(server, "POST", "/clean", json.dumps(_sample_articles()[:3]))
+    assert status == 200
+    assert lines == [{"error": "cleaning exploded"}]
+
+    with ServiceClient(_port(server)) as client:
+        with pytest.raises(RuntimeError, match="cleaning exploded"):
+            list(client.clean(_sample_articles()[:3]))
+
+
+def test_client_round_trip(server):
+    articles = _sample_articles()[:50]
+    with ServiceClient(_port(server), request_size=7) as client:
+        assert client.health()
+        cleaned = list(client.clean(from_json(a) for a in articles))
+        assert cleaned == [clean_article(from_json(a)) for a in articles]
+        assert list(client.validate(cleaned)) == [validate_record(a) for a in cleaned]
+
+
+def test_client_main_accepts_late_generated_at(server, tmp_path):
+    articles = _sample_articles()[:20]
+    input_path = str(tmp_path / "late.json")
+    with open(input_path, "w", encoding="utf-8") as f:
+        json.dump({"articles": articles, "generated_at": "2026-02-01"}, f)
+    output_path = str(tmp_path / "cleaned.jsonl")
+
+    service_client.main(["clean", input_path, output_path, "--port", str(_port(server))])
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == _expected_clean(articles)
@@ -0,0 +1,108 @@
+# validator.py
+# Validation counts, the quality report and the valid records written back to the input.
+
+import argparse
+import json
+import os
+
+import neardup
+import validator
+from article import from_json
+from cleaner import clean_article
+from conftest import ROOT
+from dedup import UrlDeduper
+
+
+ARTICLE = {
+    "url": "https://example.com/a",
+    "title": "A title",
+    "content": "Long enough content for the validator to accept this record as valid.",
+    "published": "2026-02-01T10:00:00",
+}
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_valid_records_are_written_back_unchanged(tmp_path):
+    unusual = {"content": ARTICLE["content"], "source": "wire", "title": "Other", "url": "https://b.com/"}
+    null_date = dict(ARTICLE, url="https://c.com/", published=None)
+    invalid = dict(ARTICLE, url="https://d.com/", content="")
+    input_path = str(tmp_path / "cleaned.json")
+    _write(input_path, {"generated_at": "2026-02-01", "articles": [ARTICLE, unusual, null_date, invalid]})
+
+    validator.main([input_path, str(tmp_path / "report.txt")])
+
+    saved = _read_json(input_path)
+    assert saved["articles"] == [ARTICLE, unusual, null_date]
+    assert [list(a) for a in saved["articles"]] == [list(ARTICLE), list(unusual), list(null_date)]
+
+
+def test_invalid_copy_does_not_hide_a_later_valid_one(tmp_path):
+    invalid = dict(ARTICLE, content="")
+    later = dict(ARTICLE, url="http://EXAMPLE.com/a/")
+    input_path = str(tmp_path / "cleaned.json")
+    report_path = str(tmp_path / "report.txt")
+    _write(input_path, {"generated_at": "2026-02-01", "articles": [invalid, later, ARTICLE]})
+
+    validator.main([input_path, report_path, "--dedup"])
+
+    assert _read_json(input_path)["articles"] == [later]
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = f.read()
+    assert "duplicate_url: 1\n" in report
+    assert "missing_content: 1\n" in report
+
+
+def test_near_dup_does_not_consume_positional_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?")
+    validator.add_near_dup_argument(parser)
+
+    args = parser.parse_args(["--near-dup", "0.9"])
+    assert args.input == "0.9"
+    assert validator.open_near_dup(args).threshold == neardup.DEFAULT_THRESHOLD
+
+    args = parser.parse_args(["--near-dup", "--near-dup-threshold", "0.9", "in.json"])
+    assert args.input == "in.json"
+    assert validator.open_near_dup(args).threshold == 0.9
+    assert validator.open_near_dup(parser.parse_args([])) is None
+
+
+def _mixed_records():
+    with open(os.path.join(ROOT, "sample_data.json"), "r", encoding="utf-8") as f:
+        articles = [from_json(a) for a in json.load(f)["articles"]]
+    cleaned = [clean_article(a) for a in articles]
+    odd = [None, "text", 3, {"title": "t"}, dict(ARTICLE, extra=1), ARTICLE, dict(ARTICLE, url=" ftp://x ")]
+    return cleaned + articles + odd + cleaned
+
+
+def _per_record(records, dedup=None, near_dup=None):
+    stats = validator.ValidationStats()
+    valid = []
+    for record in records:
+        if stats.add(record, dedup)[0]:
+            valid.append(record)
+            validator.check_near_duplicate(record, near_dup)
+    return stats.result(), valid
+
+
+def test_batch_matches_per_record_validation():
+    records = _mixed_records()
+    data = {"articles": records}
+    expected, valid = _per_record(records)
+    assert validator.validate(data) == expected
+    assert validator.validate_and_filter(data) == (expected, valid)
+
+    near_dup = neardup.NearDuplicateDetector()
+    expected, valid = _per_record(records, UrlDeduper(), near_dup)
+    expected = validator.add_near_duplicates(expected, near_dup)
+    assert validator.validate_and_filter(data, UrlDeduper(), neardup.NearDuplicateDetector()) == (expected, valid)
+    assert expected["error_counts"]["duplicate_url"] > 0
@@ -1,33 +1,38 @@
 # Data Validation
 # Validates cleaned_output.json and writes quality_report.txt.
 
+import argparse
 import json
 from collections import Counter
+from functools import reduce
 
+import instrument
+import jsoncodec
+from article import RECORD_TYPES, field_text
+from columnar import ArticleBatch, validate_batch
+from dataio import FORMATS, add_compression_argument, detect_format, make_writer, open_articles, open_text
+from dedup import UrlDeduper
+from neardup import DEFAULT_THRESHOLD, NearDuplicateDetector
 
-def _strip(value):
-    """Return stripped string if value is a string, else empty string."""
-    if value is None:
-        return ""
-    if isinstance(value, str):
-        return value.strip()
-    return str(value).strip()
+
+# Error code for records dropped by the optional URL deduplication stage.
+DUPLICATE_URL = "duplicate_url"
 
 
 def validate_record(record):
     """
-    Validate one record. Returns (is_valid, errors).
+    Validate one record (Article or dict). Returns (is_valid, errors).
     errors is a list of reason codes: missing_title, missing_content, missing_url,
     invalid_url, content_too_short.
     """
     errors = []
 
-    if not isinstance(record, dict):
+    if not isinstance(record, RECORD_TYPES):
         return False, ["invalid_record"]
 
-    title = _strip(record.get("title"))
-    content = _strip(record.get("content"))
-    url = _strip(record.get("url"))
+    title = field_text(record.get("title"))
+    content = field_text(record.get("content"))
+    url = field_text(record.get("url"))
 
     if not title:
         errors.append("missing_title")
@@ -49,7 +54,113 @@ def validate_record(record):
 def _is_present(record, key):
     """True if key exists and stripped value is not empty."""
     val = record.get(key)
-    return bool(_strip(val))
+    return bool(field_text(val))
+
+
+# Plain integer counters of ValidationStats (error_counts is kept separately).
+_COUNT_FIELDS = (
+    "total", "valid_count", "invalid_count", "title_present_count",
+    "content_present_count", "url_present_count", "date_present_count",
+)
+
+
+class ValidationStats:
+    """
+    Running totals behind validate(). Call add() for each record, then result()
+    for the same dict validate() returns. Lets callers validate records as they
+    are produced instead of holding the whole list. Only raw counts are kept, so
+    stats of separate shards combine exactly with merge().
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.valid_count = 0
+        self.invalid_count = 0
+        self.title_present_count = 0
+        self.content_present_count = 0
+        self.url_present_count = 0
+        self.date_present_count = 0
+        self.error_counts = Counter()
+
+    def counters(self):
+        """Raw counts as a JSON-serializable dict (see from_counters)."""
+        counters = {name: getattr(self, name) for name in _COUNT_FIELDS}
+        counters["error_counts"] = dict(self.error_counts)
+        return counters
+
+    @classmethod
+    def from_counters(cls, counters):
+        """ValidationStats holding the counts saved by counters()."""
+        stats = cls()
+        for name in _COUNT_FIELDS:
+            setattr(stats, name, counters.get(name, 0))
+        stats.error_counts = Counter(counters.get("error_counts", {}))
+        return stats
+
+    def merge(self, other):
+        """
+        New ValidationStats counting the records of both self and other. Merging is
+        associative and commutative with ValidationStats() as identity, so partial
+        stats can be combined in any order or grouping and give the same result().
+        """
+        merged = ValidationStats()
+        for name in _COUNT_FIELDS:
+            setattr(merged, name, getattr(self, name) + getattr(other, name))
+        merged.error_counts = self.error_counts + other.error_counts
+        return merged
+
+    def add(self, record, dedup=None):
+        """
+        Count one record. Returns (is_valid, errors) from validate_record. With a
+        UrlDeduper, a record that passes validate_record but whose URL was already
+        seen is invalid with error duplicate_url; only valid records' URLs are
+        remembered, so an invalid copy never hides a later valid one.
+        """
+        self.total += 1
+        if isinstance(record, RECORD_TYPES):
+            if _is_present(record, "title"):
+                self.title_present_count += 1
+            if _is_present(record, "content"):
+                self.content_present_count += 1
+            if _is_present(record, "url"):
+                self.url_present_count += 1
+            if _is_present(record, "published"):
+                self.date_present_count += 1
+
+        is_valid, errors = validate_record(record)
+        if is_valid and is_duplicate(record, dedup):
+            is_valid = False
+            errors = [DUPLICATE_URL]
+        if is_valid:
+            self.valid_count += 1
+        else:
+            self.invalid_count += 1
+            for e in errors:
+                self.error_counts[e] += 1
+        return is_valid, errors
+
+    def result(self):
+        """Return counts, completeness percentages and error_counts as a dict."""
+        total = self.total
+        title_percent = round(100.0 * self.title_present_count / total, 2) if total else 0
+        content_percent = round(100.0 * self.content_present_count / total, 2) if total else 0
+        url_percent = round(100.0 * self.url_present_count / total, 2) if total else 0
+        date_percent = round(100.0 * self.date_present_count / total, 2) if total else 0
+
+        return {
+            "total_records": total,
+            "valid_count": self.valid_count,
+            "invalid_count": self.invalid_count,
+            "title_present_count": self.title_present_count,
+            "content_present_count": self.content_present_count,
+            "url_present_count": self.url_present_count,
+            "date_present_count": self.date_present_count,
+            "title_percent": title_percent,
+            "content_percent": content_percent,
+            "url_percent": url_percent,
+            "date_percent": date_percent,
+            "error_counts": dict(self.error_counts),
+        }
 
 
 def validate(data):
@@ -59,56 +170,101 @@ def validate(data):
     title_present_count, content_present_count, url_present_count, date_present_count,
     completeness percentages, and error_counts.
     """
+    return filter_batch(ArticleBatch.from_articles(_articles(data)))[0].result()
+
+
+def _articles(data):
     articles = data.get("articles", [])
     if not isinstance(articles, list):
         articles = []
+    return articles
 
-    total = len(articles)
-    valid_count = 0
-    invalid_count = 0
-    title_present_count = 0
-    content_present_count = 0
-    url_present_count = 0
-    date_present_count = 0
-    error_counts = Counter()
-
-    for record in articles:
-        if _is_present(record, "title"):
-            title_present_count += 1
-        if _is_present(record, "content"):
-            content_present_count += 1
-        if _is_present(record, "url"):
-            url_present_count += 1
-        if _is_present(record, "published"):
-            date_present_count += 1
 
-        is_valid, errors = validate_record(record)
-        if is_valid:
-            valid_count += 1
-        else:
-            invalid_count += 1
-            for e in errors:
-                error_counts[e] += 1
-
-    title_percent = round(100.0 * title_present_count / total, 2) if total else 0
-    content_percent = round(100.0 * content_present_count / total, 2) if total else 0
-    url_percent = round(100.0 * url_present_count / total, 2) if total else 0
-    date_percent = round(100.0 * date_present_count / total, 2) if total else 0
-
-    return {
-        "total_records": total,
-        "valid_count": valid_count,
-        "invalid_count": invalid_count,
-        "title_present_count": title_present_count,
-        "content_present_count": content_present_count,
-        "url_present_count": url_present_count,
-        "date_present_count": date_present_count,
-        "title_percent": title_percent,
-        "content_percent": content_percent,
-        "url_percent": url_percent,
-        "date_percent": date_percent,
-        "error_counts": dict(error_counts),
-    }
+def merge_stats(partials):
+    """Merge an iterable of ValidationStats into one (empty stats if there are none)."""
+    return reduce(ValidationStats.merge, partials, ValidationStats())
+
+
+def write_partial(stats, path):
+    """Save stats' raw counters as JSON to path, for merging with read_partial()."""
+    with open_text(path, "w") as f:
+        json.dump(stats.counters(), f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read_partial(path):
+    """ValidationStats saved by write_partial()."""
+    with open(path, "r", encoding="utf-8") as f:
+        return ValidationStats.from_counters(json.load(f))
+
+
+def validate_and_filter(data, dedup=None, near_dup=None):
+    """
+    Validate all records in data in a single pass.
+    Returns (result, valid_articles): the validate() dict and the list of records
+    that passed validate_record, in input order. With a UrlDeduper, valid records
+    whose URL was already seen on a valid record are invalid with error duplicate_url. With a
+    NearDuplicateDetector, valid records are checked for near-duplicate content and
+    the clusters are added to result under "near_duplicates" (records are kept).
+    """
+    stats, valid_articles = filter_valid(data, dedup, near_dup)
+    return add_near_duplicates(stats.result(), near_dup), valid_articles
+
+
+def filter_valid(data, dedup=None, near_dup=None):
+    """validate_and_filter returning the ValidationStats instead of the result dict."""
+    batch = ArticleBatch.from_articles(_articles(data))
+    stats, mask = filter_batch(batch, dedup, near_dup)
+    return stats, list(batch.select(mask))
+
+
+def filter_batch(batch, dedup=None, near_dup=None, use_numpy=None):
+    """
+    Validate every record of an ArticleBatch at once (see columnar.validate_batch).
+    Returns (stats, valid_mask): the ValidationStats and one 0/1 byte per record.
+    dedup and near_dup are then applied to the valid records in order, exactly as
+    ValidationStats.add and check_near_duplicate would one record at a time.
+    """
+    counters, mask = validate_batch(batch, use_numpy)
+    stats = ValidationStats.from_counters(counters)
+    if dedup is None and near_dup is None:
+        return stats, mask
+
+    mask = bytearray(mask)
+    for i in [i for i, valid in enumerate(mask) if valid]:
+        url = batch.urls[i]
+        if dedup is not None and not dedup.add(url):
+            mask[i] = 0
+            stats.valid_count -= 1
+            stats.invalid_count += 1
+            stats.error_counts[DUPLICATE_URL] += 1
+        elif near_dup is not None:
+            near_dup.add(url, batch.contents[i])
+    return stats, mask
+
+
+def is_duplicate(record, dedup):
+    """True if dedup (a UrlDeduper, or None to disable) has already seen record's URL."""
+    if dedup is None or not isinstance(record, RECORD_TYPES):
+        return False
+    return not dedup.add(record.get("url"))
+
+
+def check_near_duplicate(record, near_dup):
+    """
+    Check a valid record's content with near_dup (a NearDuplicateDetector, or None to
+    disable). Returns the URL of the earlier article it nearly duplicates, or None.
+    """
+    if near_dup is None:
+        return None
+    return near_dup.add(record.get("url"), record.get("content"))
+
+
+def add_near_duplicates(result, near_dup):
+    """Add near_dup's cluster summary to result under "near_duplicates" (if enabled)."""
+    if near_dup is not None:
+        result["near_duplicates"] = near_dup.summary()
+    return result
 
 
 def write_report(result, output_path):
@@ -142,40 +298,136 @@ def write_report(result, output_path):
     for code, count in sorted_errors:
         lines.append(f"{code}: {count}")
 
-    with open(output_path, "w", encoding="utf-8") as f:
+    # Only present when near-duplicate detection was enabled, so the default report is unchanged.
+    near_duplicates = result.get("near_duplicates")
+    if near_duplicates is not None:
+        lines += [
+            "",
+            "----------------------",
+            "Near-duplicate content",
+            "----------------------",
+            f"Similarity threshold: {near_duplicates['threshold']}",
+            f"Duplicate clusters: {near_duplicates['cluster_count']}",
+            f"Near-duplicate records: {near_duplicates['duplicate_count']}",
+        ]
+        for url, size in near_duplicates["largest_clusters"]:
+            lines.append(f"{size} records: {url}")
+
+    with open_text(output_path, "w") as f:
         f.write("\n".join(lines) + "\n")
 
 
-def save_valid_only(data, path):
+def save_valid_only(data, path, valid_articles=None, fmt=None, compact=False, compress_level=None):
     """
     Keep only valid records in data and overwrite the file at path.
     Preserves generated_at; articles becomes only those that pass validate_record.
+    Pass valid_articles (e.g. from validate_and_filter, or any iterable of records)
+    to skip validating again. fmt is "json" or "jsonl"; by default it follows the file
+    extension. compact writes compact JSON instead of the indented default. A path ending
+    in .gz/.bz2/.xz/.zst is compressed, at compress_level if given.
     """
-    articles = data.get("articles", [])
-    if not isinstance(articles, list):
-        articles = []
-    valid_articles = [r for r in articles if validate_record(r)[0]]
-    out = {
-        "generated_at": data.get("generated_at", ""),
-        "articles": valid_articles,
-    }
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2, ensure_ascii=False)
-    print(f"Saved {len(valid_articles)} valid records to {path}")
+    if valid_articles is None:
+        valid_articles = (r for r in _articles(data) if validate_record(r)[0])
+    with open_text(path, "w", compress_level) as f:
+        writer = make_writer(f, detect_format(path, fmt), data.get("generated_at", ""), compact=compact)
+        for record in valid_articles:
+            writer.write(record)
+        writer.close()
+    print(f"Saved {writer.count} valid records to {path}")
+
+
+def add_near_dup_argument(parser):
+    """Add the --near-dup and --near-dup-threshold options shared by validator.py and pipeline.py."""
+    parser.add_argument(
+        "--near-dup",
+        action="store_true",
+        help="report clusters of valid articles with near-identical content in the quality report",
+    )
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        metavar="THRESHOLD",
+        help=f"content similarity (0-1) at which --near-dup groups articles (default: {DEFAULT_THRESHOLD})",
+    )
 
 
-def main():
-    input_path = "cleaned_output.json"
-    output_path = "quality_report.txt"
+def add_partial_argument(parser):
+    """Add the --partial option shared by validator.py and pipeline.py."""
+    parser.add_argument(
+        "--partial",
+        metavar="PATH",
+        help="also save the raw validation counters to PATH for merge_stats.py",
+    )
+
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def open_near_dup(args):
+    """Return a NearDuplicateDetector for --near-dup, or None if it was not given."""
+    if not args.near_dup:
+        return None
+    return NearDuplicateDetector(args.near_dup_threshold)
 
-    result = validate(data)
-    write_report(result, output_path)
-    print("Generated quality_report.txt")
 
-    save_valid_only(data, input_path)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate cleaned article data.")
+    parser.add_argument("input", nargs="?", default="cleaned_output.json")
+    parser.add_argument("report", nargs="?", default="quality_report.txt")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="input file format (default: jsonl for .jsonl/.ndjson, else json)",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="treat articles whose normalized URL was already seen as invalid (duplicate_url)",
+    )
+    add_near_dup_argument(parser)
+    add_partial_argument(parser)
+    jsoncodec.add_json_arguments(parser)
+    add_compression_argument(parser)
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="record per-stage timings and byte counts and write them to <report>.stats.json",
+    )
+    args = parser.parse_args(argv)
+    jsoncodec.set_backend(args.json_backend)
+    input_format = detect_format(args.input, args.format)
+    if args.stats:
+        instrument.enable()
+        instrument.count_file("bytes_in", args.input)
+
+    with instrument.stage("total"):
+        # The articles are held as one ArticleBatch (parallel columns), not a list of records.
+        with instrument.stage("json_load"), \
+                open_articles(args.input, input_format) as (generated_at, articles):
+            batch = ArticleBatch.from_articles(articles)
+        data = {} if generated_at is None else {"generated_at": generated_at}
+
+        with instrument.stage("validate"):
+            near_dup = open_near_dup(args)
+            stats, mask = filter_batch(batch, UrlDeduper() if args.dedup else None, near_dup)
+            result = add_near_duplicates(stats.result(), near_dup)
+        if args.partial:
+            write_partial(stats, args.partial)
+            print(f"Saved partial stats to {args.partial}")
+        with instrument.stage("write_report"):
+            write_report(result, args.report)
+        print(f"Generated {args.report}")
+
+        with instrument.stage("save_valid_only"):
+            save_valid_only(data, args.input, batch.select(mask), input_format, args.compact,
+                            args.compress_level)
+
+    if args.stats:
+        instrument.count("articles", result["total_records"])
+        instrument.count_file("bytes_out", args.input)
+        instrument.count_file("bytes_out", args.report)
+        instrument.disable()
+        stats_path = instrument.stats_path(args.report)
+        instrument.write_stats(stats_path)
+        print(f"Wrote stats -> {stats_path}")
 
 
 if __name__ == "__main__":